@@ -1,7 +1,32 @@
+import atexit
+import json
+import os
+import secrets
+import time
+
 import streamlit as st
-import random
 import pandas as pd
 import altair as alt
+import numpy as np
+
+import bots
+import engine
+from archive import GameArchive
+from auth import HOST, PinIndex, backoff
+from game import round_record
+from journal import Journal
+from lobby import LobbyRegistry
+from messages import render_message
+from metrics import Metrics
+from roster import UNSET
+from scheduler import RoundScheduler
+
+DATA_DIR = os.environ.get("SYNDICATE_DATA_DIR", "data")
+REFRESH_SECONDS = float(os.environ.get("SYNDICATE_REFRESH_SECONDS", "2"))
+METRICS_ENABLED = os.environ.get("SYNDICATE_METRICS", "0") == "1"
+INBOX_PAGE = 10
+LEDGER_PAGE = 3
+SESSION_KEYS = ("logged_in_user", "lobby_code", "login_failures", "login_retry_at", "session_id")  # everything else is per-table widget state
 
 # ==========================================
 # 1. UI & CSS STYLING
@@ -11,49 +36,94 @@ def inject_custom_css():
         <style>
         .ledger-success {background-color: #d1e7dd; color: #0f5132; padding: 15px; border-radius: 8px; text-align: center; border: 1px solid #badbcc;}
         .ledger-fail {background-color: #f8d7da; color: #842029; padding: 15px; border-radius: 8px; text-align: center; border: 1px solid #f5c2c7;}
+        .vault-grid {display: grid; grid-template-columns: repeat(auto-fill, minmax(170px, 1fr)); gap: 12px; margin-bottom: 12px;}
         </style>
     """, unsafe_allow_html=True)
 
 # ==========================================
 # 2. GLOBAL GAME STATE MANAGEMENT
 # ==========================================
-class GameState:
-    def __init__(self):
-        self.round = 1
-        self.max_rounds = 8
-        self.game_over = False
-        self.vault_names = ["Vault A", "Vault B", "Vault C"] 
-        self.roles_available = ["Mastermind", "Detective", "Associate", "Associate", "Associate"]
-        self.host_pin = "host123"
-        self.player_pins = {1: "p1", 2: "p2", 3: "p3", 4: "p4", 5: "p5"}
-        self.players = {
-            i: {
-                "name": f"Player {i}",
-                "role": "Associate",
-                "cash": 30.0,
-                "invest_choice": None,
-                "sabotage_choice": None,
-                "inbox": [],
-                "unread": 0,
-                "total_sabotages": 0,
-                "bankrupt_warning": False
-            } for i in range(1, 6)
-        }
-        self.history = []
-        self.wealth_history = {i: [30.0] for i in range(1, 6)} 
-        self.host_script = "Welcome, Initiates. I am the Supreme Orchestrator. The High Council controls the board; you are just playing on it. Survive our gauntlet. Round 1 begins."
+@st.cache_resource
+def get_journal(): return Journal(DATA_DIR)
 
 @st.cache_resource
-def get_state(): return GameState()
-state = get_state()
+def get_pin_index(): return PinIndex()
+
+@st.cache_resource
+def get_scheduler(): return RoundScheduler()
+
+@st.cache_resource
+def get_archive():
+    archive = GameArchive(os.path.join(DATA_DIR, "analytics"))
+    atexit.register(archive.close)  # a short last batch beats losing the buffered games on shutdown
+    return archive
+
+@st.cache_resource
+def get_registry():
+    journal, pin_index, scheduler, archive = get_journal(), get_pin_index(), get_scheduler(), get_archive()
+    def open_table(code, **options):
+        table = journal.open(code, **options)
+        pin_index.register(code, table)
+        scheduler.watch(code, table)
+        table.listeners.append(archive.on_command)
+        return table
+    def close_table(code, table):
+        scheduler.unwatch(code)
+        pin_index.drop(code)
+        journal.close(code, table)
+    registry = LobbyRegistry(open_table, on_close=close_table)
+    for code, recovered in journal.recover_all().items():
+        pin_index.register(code, recovered)
+        scheduler.watch(code, recovered)
+        recovered.listeners.append(archive.on_command)
+        registry.adopt(code, recovered)
+    return registry
+registry = get_registry()
+pin_index = get_pin_index()
+
+@st.cache_resource
+def get_metrics():
+    path = os.environ.get("SYNDICATE_METRICS_FILE", os.path.join(DATA_DIR, "metrics.prom"))
+    metrics = Metrics(METRICS_ENABLED, path, float(os.environ.get("SYNDICATE_METRICS_EVERY", "30")), stats=registry.stats)
+    get_scheduler().timer = metrics.timer  # the scheduler predates metrics (which reads the registry); its resolutions count too
+    return metrics
+metrics = get_metrics()
+# Bound per rerun in main(): `game` takes commands, `state` is the read-only snapshot the views render.
+game = None
+state = None
+# True while the whole script runs. Fragment reruns skip main() and see False, so they count themselves.
+full_run = True
 
 # ==========================================
-# 3. GAME LOGIC & RESOLUTION
+# 3. DISPLAY HELPERS
 # ==========================================
-def assign_random_roles():
-    roles = state.roles_available.copy()
-    random.shuffle(roles)
-    for i in range(1, 6): state.players[i]["role"] = roles[i-1]
+def live_snapshot():
+    """Fresh snapshot for an auto-refreshing fragment. Falls back to a full rerun when the page itself is stale."""
+    if not full_run: metrics.rerun(st.session_state.lobby_code, st.session_state.session_id)
+    current = registry.get(st.session_state.lobby_code)
+    if current is not game: st.rerun()
+    snap = current.snapshot()
+    if snap.round != state.round or snap.game_over != state.game_over: st.rerun()
+    return snap
+
+def by_version(key, snap, build):
+    """Rebuild a fragment's payload only when the table's version has moved since this session last built it."""
+    cached = st.session_state.get(key)
+    if cached is None or cached[0] != snap.version: cached = st.session_state[key] = (snap.version, build(snap))
+    return cached[1]
+
+def count_ready(snap): return int(snap.roster.ready().sum())
+
+def deadline_caption(snap):
+    if snap.round_deadline is None: return None
+    left = snap.round_deadline - time.time()
+    return f"⏳ Round closes in {left:,.0f}s — seats not locked in will hold cash." if left > 0 else "⏳ Deadline reached — resolving…"
+
+def directive_labels(snap, choices, hold):
+    """Vectorized vault index -> label for a roster column (UNSET shows as waiting)."""
+    labels = np.array(snap.vault_names + [hold, "⏳ Waiting"], dtype=object)
+    n = len(snap.vault_names)
+    return labels[np.where(choices >= 0, choices, np.where(choices == UNSET, n + 1, n))]
 
 def get_player_title(cash):
     if cash <= 10.0: return "🐀 Expendable Pawn"
@@ -61,101 +131,62 @@ def get_player_title(cash):
     elif cash <= 60.0: return "🔫 Elite Operative"
     else: return "🩸 The Chosen Asset"
 
-def render_wealth_chart():
-    chart_data = pd.DataFrame(state.wealth_history)
-    chart_data.rename(columns={i: state.players[i]['name'] for i in range(1, 6)}, inplace=True)
-    chart_data['Round'] = chart_data.index
-    melted = chart_data.melt('Round', var_name='Player', value_name='Wealth')
-    
+@st.cache_resource(max_entries=512, show_spinner=False)
+def wealth_chart_spec(game_id, n_rows, names, _rows):
+    """Vega-Lite JSON for one table's wealth lines. Built once per (game, round, name set) and shared by every session."""
+    melted = pd.DataFrame(list(_rows)[:n_rows], columns=['Round', 'pid', 'Wealth'])
+    melted['Player'] = melted.pop('pid').map(dict(names))
+
     base = alt.Chart(melted).encode(x=alt.X('Round:O', title='Round'), y=alt.Y('Wealth:Q', title='Wealth (₹ Lakhs)'), color='Player:N')
     line = base.mark_line(point=True)
     text = base.mark_text(align='left', baseline='bottom', dx=5, dy=-5, fontSize=12).encode(text='Wealth:Q')
-    return (line + text).properties(height=400)
-
-def resolve_round():
-    vault_data = {v: {"investors": [], "sabotages": 0, "pool": 0} for v in state.vault_names}
-    player_snapshot = {}
-    
-    for pid, pdata in state.players.items():
-        inv, sab = pdata["invest_choice"], pdata["sabotage_choice"]
-        player_snapshot[pid] = {"name": pdata["name"], "role": pdata["role"], "invest_choice": inv, "sabotage_choice": sab, "vault_payout": 0, "bonus_income": 0, "net_change": 0}
-        
-        if inv in state.vault_names:
-            vault_data[inv]["investors"].append(pid)
-            vault_data[inv]["pool"] += 10.0
-            state.players[pid]["cash"] -= 10.0
-        if sab in state.vault_names:
-            vault_data[sab]["sabotages"] += 1
-            state.players[pid]["total_sabotages"] += 1 
-
-    round_results = {}
-    mastermind_bonus = 0
-    total_sabotages = sum(v["sabotages"] for v in vault_data.values())
-
-    for v_name, v_info in vault_data.items():
-        base_chance, penalty = 90, 25 * v_info["sabotages"] 
-        success_chance = max(10, base_chance - penalty)
-        success = random.randint(1, 100) <= success_chance
-        
-        if success:
-            multiplier = random.choice([1.5, 2.0, 2.5])
-            payout = (v_info["pool"] * multiplier) / len(v_info["investors"]) if v_info["investors"] else 0
-            for pid in v_info["investors"]:
-                state.players[pid]["cash"] += payout
-                player_snapshot[pid]["vault_payout"] = payout
-            round_results[v_name] = {"status": "SUCCESS", "multiplier": multiplier, "sabs": v_info["sabotages"], "payout": payout}
-        else:
-            round_results[v_name] = {"status": "FAILED", "multiplier": 0, "sabs": v_info["sabotages"], "payout": 0}
-            mastermind_bonus += 10.0 
-            
-    for pid, pdata in state.players.items():
-        bonus = mastermind_bonus if pdata["role"] == "Mastermind" else 0
-        state.players[pid]["cash"] += (10.0 + bonus)
-        if bonus > 0: player_snapshot[pid]["bonus_income"] += bonus
-            
-        net = 10.0 + player_snapshot[pid]["vault_payout"] + bonus
-        if player_snapshot[pid]["invest_choice"] in state.vault_names: net -= 10.0
-        player_snapshot[pid]["net_change"] = net
-        
-        if pdata["role"] == "Detective":
-            state.players[pid]["inbox"].append(f"🕵️‍♂️ SYSTEM CLUE: There were exactly {total_sabotages} sabotages total in Round {state.round}.")
-            state.players[pid]["unread"] += 1
-
-        if state.players[pid]["cash"] <= 0:
-            state.players[pid]["cash"] = 10.0
-            state.players[pid]["bankrupt_warning"] = True
+    return (line + text).properties(height=400).to_json()
 
-        state.wealth_history[pid].append(state.players[pid]["cash"])
-        state.players[pid]["invest_choice"] = None
-        state.players[pid]["sabotage_choice"] = None
-
-    state.history.append({"round": state.round, "results": round_results, "players": player_snapshot})
-    succeeded = len([v for v, d in round_results.items() if d["status"] == "SUCCESS"])
-    if succeeded == 3: state.host_script = f"Round {state.round-1} conclusion: Flawless execution. All three vaults cracked."
-    elif succeeded == 0: state.host_script = f"Round {state.round-1} conclusion: A bloodbath. All vaults compromised. Total loss."
-    else: state.host_script = f"Round {state.round-1} conclusion: Mixed outcomes. Trust is fracturing."
-
-    if state.round >= state.max_rounds: state.game_over = True
-    else: state.round += 1
+def render_wealth_chart():
+    with metrics.timer("render_wealth_chart"):
+        names = tuple(enumerate(state.roster.names, start=1))
+        return json.loads(wealth_chart_spec(state.game_id, len(state.wealth_rows), names, state.wealth_rows))
+
+# A resolved round never changes, so its renderings are built once (the host's resolve click
+# warms them) and shared by every session; (game_id, round) keys survive a hard reset safely.
+@st.cache_resource(max_entries=4096, show_spinner=False)
+def round_ledger_html(game_id, round_no, _record):
+    """The players' Ledger cards for one round."""
+    cards = []
+    for v, res in _record['results'].items():
+        if res["status"] == "SUCCESS": cards.append(f'<div class="ledger-success"><h3>{v}</h3><b>✅ CRACKED</b><br><br>Multi: <b>{res["multiplier"]}x</b><br>Payout: <b>₹{res["payout"]:,.1f}L</b></div>')
+        else: cards.append(f'<div class="ledger-fail"><h3>{v}</h3><b>❌ COMPROMISED</b><br><br>Investments<br><b>LOST</b></div>')
+    return f'<div class="vault-grid">{"".join(cards)}</div>'
+
+@st.cache_resource(max_entries=4096, show_spinner=False)
+def round_audit(game_id, round_no, _record):
+    """The host's audit of one round: vault cards (sabotage counts included) and the per-player table."""
+    cards = []
+    for v, res in _record['results'].items():
+        if res["status"] == "SUCCESS": cards.append(f'<div class="ledger-success"><b>{v}</b><br><br>✅ SUCCESS<br><br>Sabs: <b>{res["sabs"]}</b><br>Multi: {res["multiplier"]}x<br>Payout: ₹{res["payout"]:,.1f} Lakhs</div>')
+        else: cards.append(f'<div class="ledger-fail"><b>{v}</b><br><br>❌ FAILED<br><br>Sabs: <b>{res["sabs"]}</b><br>Lost</div>')
+    p = _record['players']
+    hist_table = pd.DataFrame({"Name": p["name"], "Role": p["role"], "Invested In": p["invest_choice"], "Sabotaged": p["sabotage_choice"], "Vault Payout": [f"₹{x:,.1f} Lakhs" for x in p["vault_payout"]], "Net Change": [f"{'+' if x >= 0 else ''}₹{x:,.1f} Lakhs" for x in p["net_change"]]})
+    return f'<div class="vault-grid">{"".join(cards)}</div>', hist_table
 
 # ==========================================
 # 4. ENDGAME LEADERBOARD
 # ==========================================
 def leaderboard_view(player_id=None):
-    ranked_players = sorted(state.players.items(), key=lambda x: (x[1]['cash'], -x[1]['total_sabotages']), reverse=True)
-    top_cash, top_sabs = ranked_players[0][1]['cash'], ranked_players[0][1]['total_sabotages']
-    winners = [pid for pid, p in ranked_players if p['cash'] == top_cash and p['total_sabotages'] == top_sabs]
+    r = state.roster
+    order = r.ranking()
+    winners = np.flatnonzero((r.cash == r.cash[order[0]]) & (r.total_sabotages == r.total_sabotages[order[0]])) + 1
     
     if player_id is not None:
         if player_id in winners:
-            if state.players[player_id]['role'] == "Mastermind":
+            if r.role[player_id - 1] == engine.MASTERMIND:
                 st.error("### 🩸 THE PERFECT MOLE. You executed the Council's secret orders flawlessly and ruined your peers. Welcome to the Syndicate.")
                 st.balloons()
             else:
                 st.success("### 👑 GAUNTLET SURVIVED. You outmaneuvered the others and impressed the High Council. You are our newest Elite Asset.")
                 st.snow()
         else:
-            winner_names = " and ".join([state.players[w]['name'] for w in winners])
+            winner_names = " and ".join([r.names[w - 1] for w in winners])
             st.warning(f"### ❌ LIQUIDATED. You failed to impress the Orchestrator. {winner_names} got the contract. Clean out your locker and disappear.")
 
     st.title("🚨 THE DUST SETTLES: ENDGAME RESULTS 🚨")
@@ -164,142 +195,239 @@ def leaderboard_view(player_id=None):
     col1, col2 = st.columns([1, 2])
     with col1:
         st.subheader("📊 Final Rankings")
-        final_table = [{"Rank": f"#{i+1}", "Player": p["name"], "Role": p["role"], "Cash": f"₹{p['cash']:,.1f} Lakhs", "Sabs": p["total_sabotages"]} for i, (pid, p) in enumerate(ranked_players)]
-        st.dataframe(pd.DataFrame(final_table), use_container_width=True, hide_index=True)
+        final_table = pd.DataFrame({"Rank": [f"#{i+1}" for i in range(len(order))], "Player": np.array(r.names, dtype=object)[order],
+                                    "Role": [r.role_name(pid) for pid in order + 1], "Cash": [f"₹{c:,.1f} Lakhs" for c in r.cash[order]], "Sabs": r.total_sabotages[order]})
+        st.dataframe(final_table, use_container_width=True, hide_index=True)
 
     with col2:
         st.subheader("📈 Final Wealth Trajectories")
-        st.altair_chart(render_wealth_chart(), use_container_width=True)
+        st.vega_lite_chart(render_wealth_chart(), use_container_width=True)
 
 # ==========================================
 # 5. HOST VIEW
 # ==========================================
+@st.fragment(run_every=REFRESH_SECONDS)
+def host_ready_bar():
+    with metrics.timer("fragment.host_ready_bar"):
+        snap = live_snapshot()
+        ready_count, n = count_ready(snap), len(state.roster)
+        if (ready_count == n) != (count_ready(state) == n): st.rerun()  # the sidebar resolve button lives outside this fragment
+        st.progress(ready_count / n, text=f"Initiates Ready: {ready_count} / {n}")
+        if deadline_caption(snap): st.caption(deadline_caption(snap))
+
+@st.fragment(run_every=REFRESH_SECONDS)
+def host_live_actions():
+    with metrics.timer("fragment.host_live_actions"):
+        build = lambda snap: pd.DataFrame({"Name": snap.roster.names, "Role": [snap.roster.role_name(pid) for pid in snap.roster.pids], "Cash": [f"₹{c:,.1f} Lakhs" for c in snap.roster.cash],
+                                           "Invested In": directive_labels(snap, snap.roster.invest, "Hold Cash"), "Sabotaging": directive_labels(snap, snap.roster.sabotage, "None")}, index=snap.roster.pids)
+        st.dataframe(by_version("_live_actions", live_snapshot(), build), use_container_width=True)
+
 def host_view():
     if state.game_over:
         leaderboard_view()
         return
 
     st.title("🏦 Host Dashboard")
+    st.caption(f"Table join code: **{st.session_state.lobby_code}**")
+    just_reset = st.session_state.pop("just_reset", False)
+    if just_reset: st.success("Table reset with fresh PINs for you and every seat. They are listed under 🔑 3. Manage Access PINs.")
     st.info(f"**🗣️ Read to players:**\n\n{state.host_script}")
     
-    ready_count = sum(1 for p in state.players.values() if p["invest_choice"] and p["sabotage_choice"])
-    col1, col2 = st.columns([2, 1])
-    with col1: 
-        st.header(f"Current Round: {state.round} / {state.max_rounds}")
-        st.progress(ready_count / 5.0, text=f"Initiates Ready: {ready_count} / 5")
-    with col2: 
-        if st.button("🔄 Force Global Sync", use_container_width=True): st.rerun()
+    ready_count, n = count_ready(state), len(state.roster)
+    st.header(f"Current Round: {state.round} / {state.max_rounds}")
+    host_ready_bar()
 
     st.sidebar.header("⚙️ Game Controls")
-    if ready_count == 5:
+    if ready_count == n:
         if st.sidebar.button("🚨 RESOLVE ROUND 🚨", type="primary", use_container_width=True):
-            resolve_round()
+            with metrics.timer("resolve_round"):
+                if game.submit("resolve_round", expected_round=state.round):
+                    record = round_record(game.snapshot().history, state.round)
+                    round_audit(state.game_id, state.round, record)
+                    round_ledger_html(state.game_id, state.round, record)
             st.rerun()
     else:
-        st.sidebar.warning(f"Waiting for {5 - ready_count} players to lock in.")
+        st.sidebar.warning(f"Waiting for {n - ready_count} players to lock in.")
 
+    name_of = lambda pid: state.roster.names[pid - 1]
+    # Small tables list every seat; mega tables edit one picked seat at a time.
+    seats = state.roster.pids if n <= 10 else [st.sidebar.selectbox("Seat to edit", state.roster.pids, format_func=lambda x: f"P{x} · {name_of(x)}")]
     with st.sidebar.expander("🎭 1. Setup & Roles"):
-        if st.button("Shuffle Roles"): assign_random_roles()
-        for i in range(1, 6):
-            new_name = st.text_input(f"P{i} Name", value=state.players[i]["name"], key=f"n_{i}")
-            if new_name: state.players[i]["name"] = new_name
+        if st.button("Shuffle Roles"): game.submit("shuffle_roles")
+        for i in seats:
+            new_name = st.text_input(f"P{i} Name", value=name_of(i), key=f"n_{i}")
+            if new_name and new_name != name_of(i): game.submit("rename", pid=i, name=new_name)
+
+    with st.sidebar.expander("⏱️ Round Clock"):
+        auto = st.checkbox("Resolve as soon as everyone is locked in", value=state.auto_resolve)
+        seconds = st.number_input("Round deadline (seconds, 0 = none)", min_value=0, max_value=3600, value=state.round_seconds, step=15)
+        game.submit("set_round_clock", auto_resolve=auto, seconds=int(seconds))
+
+    with st.sidebar.expander("🤖 Bot Seats"):
+        st.caption("Empty seats can be played by the server so the round is never stuck waiting.")
+        options = ["👤 Human"] + list(bots.STRATEGIES)
+        for i in seats:
+            choice = st.selectbox(f"{name_of(i)}", options, index=options.index(state.bots.get(i, "👤 Human")), key=f"bot_{i}")
+            strategy = None if choice == options[0] else choice
+            if strategy != state.bots.get(i): game.submit("set_bot", pid=i, strategy=strategy)
 
     with st.sidebar.expander("✉️ 2. Send Secret Message"):
-        target = st.selectbox("Select Player", range(1, 6), format_func=lambda x: state.players[x]["name"])
+        target = st.selectbox("Select Player", state.roster.pids, format_func=name_of)
         msg = st.text_area("Message to Player")
         if st.button("Send as Host"):
-            state.players[target]["inbox"].append(f"👑 FROM ORCHESTRATOR: {msg}")
-            state.players[target]["unread"] += 1
+            game.submit("host_message", target=target, text=msg)
             st.success("Message Sent!")
 
-    with st.sidebar.expander("🔑 3. Manage Access PINs"):
-        for i in range(1, 6):
-            new_pin = st.text_input(f"{state.players[i]['name']} PIN", value=state.player_pins[i], key=f"pin_{i}")
-            if new_pin: state.player_pins[i] = new_pin
+    with st.sidebar.expander("🔑 3. Manage Access PINs", expanded=just_reset):
+        # PINs are unique server-wide; the index is claimed first so a clash never reaches the table.
+        code = st.session_state.lobby_code
+        new_pin = st.text_input("Host PIN", value=state.host_pin, key="pin_host")
+        if new_pin and new_pin != state.host_pin:
+            if pin_index.claim(code, HOST, new_pin): game.submit("set_host_pin", pin=new_pin)
+            else: st.error("That PIN is already in use.")
+        for i in seats:
+            new_pin = st.text_input(f"{name_of(i)} PIN", value=state.player_pins[i], key=f"pin_{i}")
+            if new_pin and new_pin != state.player_pins[i]:
+                if pin_index.claim(code, i, new_pin): game.submit("set_pin", pid=i, pin=new_pin)
+                else: st.error(f"PIN for {name_of(i)} is already in use.")
+
+    with st.sidebar.expander("🏢 4. Server Load"):
+        lobby_stats = registry.stats()  # server-wide sizes, refreshed at most every registry.stats_every seconds
+        own_bytes = registry.table_bytes(st.session_state.lobby_code)
+        st.metric("Live Tables", len(registry))
+        if own_bytes is not None:
+            avg = f" · Avg table: ~{sum(l['bytes'] for l in lobby_stats) / len(lobby_stats) / 1024:,.1f} KB" if lobby_stats else ""
+            st.caption(f"This table: ~{own_bytes / 1024:,.1f} KB{avg}")
+        if get_journal().last_recovery:
+            tables, events, secs, failed = get_journal().last_recovery
+            st.caption(f"Startup recovery: {tables} tables, {events} events replayed in {secs * 1000:,.0f} ms")
+            if failed: st.warning(f"{len(failed)} table(s) failed to recover and were left on disk: {', '.join(failed)}. See the server log.")
+        st.caption(f"Analytics archive: {get_archive().written:,} finished games written, {len(get_archive()):,} waiting for the next batch")
+
+    with st.sidebar.expander("🩺 5. Diagnostics"):
+        if not metrics.enabled: st.caption("Instrumentation is off. Start the server with SYNDICATE_METRICS=1 to collect timings.")
+        else:
+            diag = metrics.snapshot()
+            st.metric("Active Sessions", diag["active_sessions"])
+            st.caption(f"This table: {diag['reruns'].get(st.session_state.lobby_code, 0):,} reruns" + (f" · ~{own_bytes / 1024:,.1f} KB state" if own_bytes is not None else ""))
+            st.dataframe(pd.DataFrame([{"Section": name, "Runs": s["count"], "p50 ms": s["p50_s"] * 1000, "p95 ms": s["p95_s"] * 1000, "Max ms": s["max_s"] * 1000}
+                                       for name, s in diag["sections"].items()]).round(1), hide_index=True, use_container_width=True)
+            if metrics.path: st.caption(f"Exported every {metrics.every:.0f}s to `{metrics.path}`")
 
     st.sidebar.divider()
     with st.sidebar.expander("⚠️ DANGER ZONE: Hard Reset"):
         reset_pin = st.text_input("Enter Host PIN to confirm:", type="password", key="reset")
         if st.button("🚨 CONFIRM HARD RESET", use_container_width=True):
-            if reset_pin == state.host_pin:
-                st.cache_resource.clear()
-                st.session_state.logged_in_user = None
+            code = st.session_state.lobby_code
+            wait = st.session_state.login_retry_at - time.monotonic()
+            if wait > 0: st.error(f"Too many failed attempts. Try again in {wait:.0f}s.")
+            elif pin_index.lookup(reset_pin, code) == (code, HOST):
+                st.session_state.login_failures = 0
+                registry.reset(code, n_players=n, n_vaults=len(state.vault_names), max_rounds=state.max_rounds)
+                # Stay logged in as host; drop keyed widgets (names, PINs) so they don't replay the old table's values.
+                for key in [k for k in st.session_state if k not in SESSION_KEYS]: del st.session_state[key]
+                st.session_state.just_reset = True
                 st.rerun()
-            elif reset_pin != "": st.error("Invalid PIN.")
+            elif reset_pin != "":
+                st.session_state.login_failures += 1
+                st.session_state.login_retry_at = time.monotonic() + backoff(st.session_state.login_failures)
+                st.error("Invalid PIN.")
 
     st.subheader("👁️ Live Player Actions")
-    player_data = [{"Name": p["name"], "Role": p["role"], "Cash": f"₹{p['cash']:,.1f} Lakhs", "Invested In": p["invest_choice"] or "⏳ Waiting", "Sabotaging": p["sabotage_choice"] or "⏳ Waiting"} for p in state.players.values()]
-    st.dataframe(pd.DataFrame(player_data), use_container_width=True)
+    host_live_actions()
 
     st.subheader("📈 Live Wealth Analytics")
-    st.altair_chart(render_wealth_chart(), use_container_width=True)
+    st.vega_lite_chart(render_wealth_chart(), use_container_width=True)
 
     st.divider()
     st.subheader("📜 Historical Round Data")
     if state.history:
-        round_options = [f"Round {h['round']}" for h in state.history]
-        selected_str = st.selectbox("Select Past Round", reversed(round_options))
-        r_num = int(selected_str.split(" ")[1])
-        r_data = next(h for h in state.history if h['round'] == r_num)
-        
-        res = r_data['results']
-        cols = st.columns(3)
-        for idx, v in enumerate(state.vault_names):
-            with cols[idx]:
-                if res[v]["status"] == "SUCCESS": st.success(f"**{v}**\n\n✅ SUCCESS\n\nSabs: **{res[v]['sabs']}**\n\nMulti: {res[v]['multiplier']}x\n\nPayout: ₹{res[v]['payout']:,.1f} Lakhs")
-                else: st.error(f"**{v}**\n\n❌ FAILED\n\nSabs: **{res[v]['sabs']}**\n\nLost")
-        
-        hist_table = [{"Name": p["name"], "Role": p["role"], "Invested In": p["invest_choice"] or "Hold Cash", "Sabotaged": p["sabotage_choice"] or "None", "Vault Payout": f"₹{p['vault_payout']:,.1f} Lakhs", "Net Change": f"{'+' if p['net_change'] >= 0 else ''}₹{p['net_change']:,.1f} Lakhs"} for p in r_data['players'].values()]
-        st.dataframe(pd.DataFrame(hist_table), use_container_width=True, hide_index=True)
+        with metrics.timer("history_audit"):
+            latest = len(state.history)
+            r_num = int(st.number_input("Select Past Round", min_value=1, max_value=latest, value=latest, key=f"audit_round_{latest}"))
+            cards, hist_table = round_audit(state.game_id, r_num, round_record(state.history, r_num))
+            st.markdown(cards, unsafe_allow_html=True)
+            st.dataframe(hist_table, use_container_width=True, hide_index=True)
 
 # ==========================================
 # 6. PLAYER VIEW
 # ==========================================
+@st.fragment(run_every=REFRESH_SECONDS)
+def player_live_status(player_id):
+    with metrics.timer("fragment.player_live_status"):
+        snap = live_snapshot()
+        r, i = snap.roster, player_id - 1
+        c1, c2, c3 = st.columns(3)
+        c1.metric("💰 Liquid Assets", f"₹{r.cash[i]:,.1f} Lakhs")
+        c2.metric("⏱️ Active Round", f"{state.round} / {state.max_rounds}")
+        c3.metric("📡 Unread Comms", f"🔴 {r.unread[i]}" if r.unread[i] > 0 else "0")
+        if deadline_caption(snap): st.caption(deadline_caption(snap))
+
+@st.fragment(run_every=REFRESH_SECONDS)
+def player_inbox(player_id):
+    with metrics.timer("fragment.player_inbox"):
+        snap = live_snapshot()
+        if snap.roster.unread[player_id - 1] > 0: game.submit("read_inbox", pid=player_id)
+        ck = f"inbox_cursor_{player_id}"
+        cursor = st.session_state.get(ck)
+        msgs, older = snap.messages.page(player_id, before=cursor, limit=INBOX_PAGE)
+        st.markdown("<br>", unsafe_allow_html=True)
+        for m in msgs: st.info(render_message(m, snap.roster.names))
+        if not msgs: st.caption("No transmissions yet.")
+
+        total = snap.messages.count(player_id)
+        if total > INBOX_PAGE:
+            end = total if cursor is None else cursor
+            st.caption(f"Showing {end - len(msgs) + 1}–{end} of {total}")
+            c_new, c_old = st.columns(2)
+            if c_new.button("⏮ Newest", key=f"{ck}_new", disabled=cursor is None, use_container_width=True):
+                st.session_state[ck] = None
+                st.rerun(scope="fragment")
+            if c_old.button("Older ▸", key=f"{ck}_old", disabled=older is None, use_container_width=True):
+                st.session_state[ck] = older
+                st.rerun(scope="fragment")
+
 def player_view(player_id):
     if state.game_over:
         leaderboard_view(player_id)
         return
 
-    pdata = state.players[player_id]
+    r, i = state.roster, player_id - 1
+    role = r.role_name(player_id)
     
-    st.markdown(f"## 👤 {pdata['name']} | Status: {get_player_title(pdata['cash'])}")
+    st.markdown(f"## 👤 {r.names[i]} | Status: {get_player_title(r.cash[i])}")
     
-    if pdata.get("bankrupt_warning"):
+    if r.bankrupt_warning[i]:
         st.error("🩸 **COFFERS EMPTY:** You lost everything. The High Council is fronting you ₹10 Lakhs because we aren't done playing with you yet.")
-        state.players[player_id]["bankrupt_warning"] = False
+        game.submit("ack_bankruptcy", pid=player_id)
 
-    c1, c2, c3 = st.columns(3)
-    c1.metric("💰 Liquid Assets", f"₹{pdata['cash']:,.1f} Lakhs")
-    c2.metric("⏱️ Active Round", f"{state.round} / {state.max_rounds}")
-    with c3:
-        if st.button("📡 Ping Server", use_container_width=True): st.rerun()
+    player_live_status(player_id)
 
     with st.expander("👁️ Reveal Encrypted Identity"):
-        st.info(f"Your hidden role is: **{pdata['role']}**")
+        st.info(f"Your hidden role is: **{role}**")
 
     st.divider()
-    comms_name = f"📡 Comms 🔴 ({pdata['unread']})" if pdata["unread"] > 0 else "📡 Comms"
+    comms_name = f"📡 Comms 🔴 ({r.unread[i]})" if r.unread[i] > 0 else "📡 Comms"
     tab_action, tab_comms, tab_ledger, tab_dossier = st.tabs(["⚡ Terminal", comms_name, "📜 Ledger", "📁 Dossier"])
 
-    with tab_action:
-        if pdata["invest_choice"] and pdata["sabotage_choice"]:
+    with tab_action, metrics.timer("tab.terminal"):
+        if r.ready()[i]:
             st.success("✅ Protocol locked. Awaiting Council resolution.")
         else:
-            if pdata["role"] == "Mastermind": st.write("### 🩸 Select your targets, Mole. The Council is ready to wire your failure bonuses.")
-            elif pdata["role"] == "Detective": st.write("### 🕵️‍♂️ Lock in your moves. Wiretaps are active for post-round sabotage data.")
+            if role == "Mastermind": st.write("### 🩸 Select your targets, Mole. The Council is ready to wire your failure bonuses.")
+            elif role == "Detective": st.write("### 🕵️‍♂️ Lock in your moves. Wiretaps are active for post-round sabotage data.")
             else: st.write("### 💼 Lock in your market positions.")
             
             with st.form("action_form"):
                 col_inv, col_sab = st.columns(2)
-                with col_inv: invest = st.radio("💰 1. Investment (Costs ₹10 Lakhs)", ["🏦 Vault A", "🏦 Vault B", "🏦 Vault C", "💵 Hold Cash"])
-                with col_sab: sabotage = st.radio("🧨 2. Sabotage (Free)", ["🛑 None", "🧨 Vault A", "🧨 Vault B", "🧨 Vault C"])
+                with col_inv: invest = st.radio("💰 1. Investment (Costs ₹10 Lakhs)", [f"🏦 {v}" for v in state.vault_names] + ["💵 Hold Cash"])
+                with col_sab: sabotage = st.radio("🧨 2. Sabotage (Free)", ["🛑 None"] + [f"🧨 {v}" for v in state.vault_names])
                 
                 if st.form_submit_button("🔒 Execute Directives", type="primary", use_container_width=True):
-                    state.players[player_id]["invest_choice"] = invest.replace("🏦 ", "").replace("💵 ", "")
-                    state.players[player_id]["sabotage_choice"] = sabotage.replace("🧨 ", "").replace("🛑 ", "")
+                    game.submit("lock_in", pid=player_id, invest=invest.replace("🏦 ", "").replace("💵 ", ""), sabotage=sabotage.replace("🧨 ", "").replace("🛑 ", ""))
                     st.rerun()
 
-    with tab_comms:
+    with tab_comms, metrics.timer("tab.comms"):
         c_inbox, c_send = st.columns(2)
         with c_inbox:
             st.subheader("📥 Inbox")
@@ -307,46 +435,41 @@ def player_view(player_id):
             if ik not in st.session_state: st.session_state[ik] = False
             def toggle(): 
                 st.session_state[ik] = not st.session_state[ik]
-                if st.session_state[ik]: state.players[player_id]["unread"] = 0 
+                if st.session_state[ik]: game.submit("read_inbox", pid=player_id)
             st.button("🙈 Hide" if st.session_state[ik] else "👁️ Reveal", on_click=toggle, use_container_width=True)
 
-            if st.session_state[ik]:
-                st.markdown("<br>", unsafe_allow_html=True)
-                for m in reversed(pdata["inbox"]): st.info(m)
+            if st.session_state[ik]: player_inbox(player_id)
             else: st.caption("Messages hidden to prevent shoulder-surfing.")
 
         with c_send:
             st.subheader("📤 Transmit")
             st.caption("Cost: ₹1.0 Lakhs per message")
-            target_id = st.selectbox("Recipient", [i for i in range(1, 6) if i != player_id], format_func=lambda x: state.players[x]['name'])
+            target_id = st.selectbox("Recipient", [pid for pid in r.pids if pid != player_id], format_func=lambda x: r.names[x - 1])
             msg_text = st.text_input("Payload:")
             if st.button("Send (-₹1L)"):
-                if pdata["cash"] >= 1.0:
-                    state.players[player_id]["cash"] -= 1.0
-                    state.players[target_id]["inbox"].append(f"📩 From {pdata['name']}: {msg_text}")
-                    state.players[target_id]["unread"] += 1
+                if game.submit("send_message", sender=player_id, target=target_id, text=msg_text):
                     st.success("Transmitted!")
                 else: st.error("Insufficient liquidity.")
 
-    with tab_ledger:
+    with tab_ledger, metrics.timer("tab.ledger"):
         st.markdown("### 📜 Market Report")
-        for h in reversed(state.history):
-            with st.expander(f"Round {h['round']} Audit", expanded=(h['round'] == state.round - 1)):
-                cols = st.columns(3)
-                for idx, v in enumerate(state.vault_names):
-                    res = h['results'][v]
-                    with cols[idx]:
-                        if res["status"] == "SUCCESS": st.markdown(f'<div class="ledger-success"><h3>{v}</h3><b>✅ CRACKED</b><br><br>Multi: <b>{res["multiplier"]}x</b><br>Payout: <b>₹{res["payout"]:,.1f}L</b></div>', unsafe_allow_html=True)
-                        else: st.markdown(f'<div class="ledger-fail"><h3>{v}</h3><b>❌ COMPROMISED</b><br><br>Investments<br><b>LOST</b></div>', unsafe_allow_html=True)
-
-    with tab_dossier:
-        st.markdown("""
+        latest = len(state.history)
+        # One page of LEDGER_PAGE rounds at a time, so round 500 renders as cheaply as round 8.
+        newest = int(st.number_input("Show rounds up to", min_value=1, max_value=latest, value=latest, key=f"ledger_round_{latest}")) if latest > LEDGER_PAGE else latest
+        for rn in range(newest, max(newest - LEDGER_PAGE, 0), -1):
+            with st.expander(f"Round {rn} Audit", expanded=(rn == latest)):
+                st.markdown(round_ledger_html(state.game_id, rn, round_record(state.history, rn)), unsafe_allow_html=True)
+
+    with tab_dossier, metrics.timer("tab.dossier"):
+        letters = [v.removeprefix("Vault ") for v in state.vault_names]
+        vault_list = letters[0] if len(letters) == 1 else f"{letters[0]} or {letters[1]}" if len(letters) == 2 else ", ".join(letters[:-1]) + f", or {letters[-1]}"
+        st.markdown(f"""
         ### 📜 The Council's Gauntlet
-        I am the Supreme Orchestrator. My four partners and I—the High Council—have built this financial empire. Now, we need a new operative to do our dirty work, so we have pulled five of you from the crowd to run our simulator. The Council is watching. The candidate with the highest net worth at the end of Round 8 wins a lucrative contract with our Syndicate. The rest of you are liquidated.
+        I am the Supreme Orchestrator. My four partners and I—the High Council—have built this financial empire. Now, we need a new operative to do our dirty work, so we have pulled {len(r)} of you from the crowd to run our simulator. The Council is watching. The candidate with the highest net worth at the end of Round {state.max_rounds} wins a lucrative contract with our Syndicate. The rest of you are liquidated.
         
         * **The Goal:** End the game with the most money to impress the High Council.
         * **The Salary:** You passively receive ₹10 Lakhs at the end of every round just for surviving.
-        * **The Investment:** You may invest ₹10 Lakhs into Vault A, B, or C. If the heist succeeds, the pool is multiplied (1.5x, 2.0x, or 2.5x) and split among the investors. 
+        * **The Investment:** You may invest ₹10 Lakhs into Vault {vault_list}. If the heist succeeds, the pool is multiplied (1.5x, 2.0x, or 2.5x) and split among the investors. 
         * **Corporate Sabotage:** You can secretly plant explosives on a vault for free, dropping its success rate by 25%.
         * **Hidden Roles:** The Council has secretly hired one of you as the **Mastermind** (our inside mole) who gets a ₹10 Lakhs bonus from us every time a vault fails. Another is the **Detective**, who receives our private server logs showing exactly how many sabotages occurred.
         * **Secure Comms:** Use your encrypted messaging to form cartels or extort your peers. Each message costs ₹1.0 Lakh.
@@ -358,11 +481,23 @@ def player_view(player_id):
 # 7. ROUTING
 # ==========================================
 def main():
+    global game, state
     st.set_page_config(page_title="The Syndicate", layout="wide", page_icon="🏦")
     inject_custom_css()
     if "logged_in_user" not in st.session_state: st.session_state.logged_in_user = None
+    if "lobby_code" not in st.session_state: st.session_state.lobby_code = None
+    if "login_failures" not in st.session_state: st.session_state.login_failures, st.session_state.login_retry_at = 0, 0.0
+    if "session_id" not in st.session_state: st.session_state.session_id = secrets.token_hex(8)
 
     if st.session_state.logged_in_user is not None:
+        game = registry.get(st.session_state.lobby_code)
+        if game is None:
+            st.session_state.logged_in_user = st.session_state.lobby_code = None
+            st.warning("This table has closed.")
+
+    if st.session_state.logged_in_user is not None:
+        state = game.snapshot()
+        metrics.rerun(st.session_state.lobby_code, st.session_state.session_id)
         if st.sidebar.button("🚪 Log Out Terminal"):
             st.session_state.logged_in_user = None
             st.rerun()
@@ -373,15 +508,35 @@ def main():
         with center:
             with st.form("login_form", border=True):
                 st.markdown("<h2 style='text-align: center; margin-top: 0;'>🏦 The Syndicate Network</h2>", unsafe_allow_html=True)
+                code_input = st.text_input("Table Code (optional)", placeholder="e.g. K7QX2")
                 pin_input = st.text_input("Clearance PIN", type="password", placeholder="Enter PIN here...")
                 if st.form_submit_button("Authenticate", type="primary", use_container_width=True):
-                    if pin_input == state.host_pin: st.session_state.logged_in_user = "HOST"; st.rerun()
-                    else:
-                        for pid, pin in state.player_pins.items():
-                            if pin_input == pin: st.session_state.logged_in_user = pid; st.rerun()
-                        if st.session_state.logged_in_user is None: st.error("Access Denied.")
+                    with metrics.timer("login"):
+                        wait = st.session_state.login_retry_at - time.monotonic()
+                        if wait > 0: st.error(f"Too many failed attempts. Try again in {wait:.0f}s.")
+                        else:
+                            seat = pin_index.lookup(pin_input, code_input.strip().upper() or None)
+                            if seat is None or registry.get(seat[0]) is None:
+                                st.session_state.login_failures += 1
+                                st.session_state.login_retry_at = time.monotonic() + backoff(st.session_state.login_failures)
+                                st.error("Access Denied.")
+                            else:
+                                st.session_state.login_failures = 0
+                                st.session_state.lobby_code, st.session_state.logged_in_user = seat
+                                st.rerun()
+            with st.expander("📐 Table Size"):
+                n_players = st.number_input("Players", min_value=3, max_value=500, value=5)
+                n_vaults = st.number_input("Vaults", min_value=1, max_value=50, value=3)
+            if st.button("🆕 Open a New Table", use_container_width=True):
+                st.session_state.lobby_code = registry.create(n_players=int(n_players), n_vaults=int(n_vaults))
+                st.session_state.logged_in_user = HOST
+                st.rerun()
                 
-    elif st.session_state.logged_in_user == "HOST": host_view()
-    else: player_view(st.session_state.logged_in_user)
+    elif st.session_state.logged_in_user == HOST:
+        with metrics.timer("view.host"): host_view()
+    else:
+        with metrics.timer("view.player"): player_view(st.session_state.logged_in_user)
 
-if __name__ == "__main__": main()
+if __name__ == "__main__":
+    try: main()
+    finally: full_run = False
@@ -0,0 +1,247 @@
+"""Columnar archive of finished games, a streaming loader over it, and prebuilt aggregate queries.
+
+Layout under the archive root::
+
+    date=YYYY-MM-DD/part-<HHMMSS>-<ns>.npz   one batch of finished games, written whole
+
+A batch holds four tables as flat ``<table>.<column>`` arrays. Every row of ``seats``,
+``rounds`` and ``vaults`` carries ``game``, its game's row in ``games`` within that file:
+
+    games    id, finished (epoch s), players, vaults, rounds
+    seats    pid, role, final cash, rank (1 = top of the leaderboard), message spend, sabotages
+    rounds   one row per player per round: role, invest / sabotage vault (-1 = none), vault payout,
+             bonus, net change, bailout, cash after the round, hit (invested in a vault that paid)
+    vaults   one row per vault per round: success, sabotages, multiplier, payout
+
+Finished games are buffered and written ``batch_games`` at a time; a daemon thread also
+writes out any game that has waited ``max_age`` seconds, and ``close`` flushes the rest.
+A crash or SIGKILL loses at most the last ``max_age`` seconds of finished games here;
+their event logs are still in the journal's ``archive/``. Batches are compressed NumPy ``.npz`` files rather than Parquet
+so the app needs nothing beyond NumPy; each column is its own compressed member, so a
+query only inflates the columns it names and a reader never holds more than one batch.
+
+    python -m archive --root data/analytics --since 2026-01-01
+"""
+import argparse
+import glob
+import logging
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+import engine
+from roster import ROLE_NAMES
+
+log = logging.getLogger(__name__)
+
+TABLES = ("seats", "rounds", "vaults")  # tables joined to ``games`` by their ``game`` column
+
+
+def game_columns(snap, finished):
+    """One finished game's snapshot as ``{"table.column": array}``, without the ``game`` join columns."""
+    r, history, vault_names = snap.roster, list(snap.history), snap.vault_names
+    n, n_rounds, n_vaults = len(r), len(history), len(vault_names)
+    index = {v: i for i, v in enumerate(vault_names)}
+
+    def players(key, dtype, convert=lambda x: x): return np.array([convert(x) for h in history for x in h["players"][key]], dtype=dtype)
+    def vaults(key, dtype): return np.array([h["results"][v][key] for h in history for v in vault_names], dtype=dtype)
+
+    rank = np.empty(n, dtype=np.int16)
+    rank[r.ranking()] = np.arange(1, n + 1)
+    invest = players("invest_choice", np.int16, lambda c: index.get(c, -1))
+    success = np.array([h["results"][v]["status"] == "SUCCESS" for h in history for v in vault_names], dtype=bool)
+    rounds = np.repeat(np.arange(1, n_rounds + 1, dtype=np.int16), n)
+    cash = np.array(list(snap.wealth_rows)[n:], dtype=np.float64).reshape(-1, 3)[:, 2]  # wealth_rows opens with the round-0 stakes
+    return {
+        "games.id": np.array([snap.game_id]), "games.finished": np.array([finished], dtype=np.float64),
+        "games.players": np.array([n], dtype=np.int16), "games.vaults": np.array([n_vaults], dtype=np.int16),
+        "games.rounds": np.array([n_rounds], dtype=np.int16),
+        "seats.pid": np.arange(1, n + 1, dtype=np.int16), "seats.role": r.role.astype(np.int8), "seats.cash": r.cash.astype(np.float32),
+        "seats.rank": rank, "seats.spend": r.message_spend.astype(np.float32), "seats.sabotages": r.total_sabotages.astype(np.int16),
+        "rounds.round": rounds, "rounds.pid": np.tile(np.arange(1, n + 1, dtype=np.int16), n_rounds),
+        "rounds.role": players("role", np.int8, engine.ROLE_CODES.get), "rounds.invest": invest,
+        "rounds.sabotage": players("sabotage_choice", np.int16, lambda c: index.get(c, -1)),
+        "rounds.vault_payout": players("vault_payout", np.float32), "rounds.bonus": players("bonus_income", np.float32),
+        "rounds.net_change": players("net_change", np.float32), "rounds.bailout": players("bailout", bool),
+        "rounds.cash": cash.astype(np.float32),
+        "rounds.hit": (invest >= 0) & success.reshape(n_rounds, n_vaults)[rounds - 1, np.maximum(invest, 0)],
+        "vaults.round": np.repeat(np.arange(1, n_rounds + 1, dtype=np.int16), n_vaults), "vaults.vault": np.tile(np.arange(n_vaults, dtype=np.int16), n_rounds),
+        "vaults.success": success, "vaults.sabotages": vaults("sabs", np.int16), "vaults.multiplier": vaults("multiplier", np.float32),
+        "vaults.payout": vaults("payout", np.float32),
+    }
+
+
+def concat(games):
+    """Stack per-game columns into one batch and add each table's ``game`` join column."""
+    batch = {key: np.concatenate([g[key] for g in games]) for key in games[0]}
+    for table in TABLES:
+        first = next(key for key in games[0] if key.startswith(table + "."))
+        batch[table + ".game"] = np.repeat(np.arange(len(games), dtype=np.int32), [len(g[first]) for g in games])
+    return batch
+
+
+class GameArchive:
+    def __init__(self, root, batch_games=256, max_age=600.0):
+        self.root, self.batch_games, self.max_age = root, batch_games, max_age
+        self.written = 0
+        self._pending, self._oldest = [], None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        threading.Thread(target=self._flush_loop, name="archive-flush", daemon=True).start()
+
+    def __len__(self): return len(self._pending)
+
+    def on_command(self, game, cmd):
+        """``GameState.listeners`` hook: archive a game the moment its final round resolves."""
+        if cmd == "resolve_round" and game.game_over: self.add(game)
+
+    def add(self, game):
+        columns = game_columns(game.snapshot(), time.time())
+        with self._lock:
+            self._pending.append(columns)
+            if self._oldest is None: self._oldest = time.monotonic()
+            if len(self._pending) >= self.batch_games: self._write()
+
+    def _flush_loop(self):
+        """Write out batches that have waited ``max_age`` seconds. A failed write is logged and retried next pass."""
+        while not self._stop.wait(min(self.max_age / 4, 60.0)):
+            try:
+                with self._lock:
+                    if self._pending and time.monotonic() - self._oldest >= self.max_age: self._write()
+            except Exception: log.exception("game archive: writing a batch failed; %d games stay buffered", len(self._pending))
+
+    def close(self):
+        self._stop.set()
+        return self.flush()
+
+    def flush(self):
+        """Write whatever is buffered as a (possibly short) batch. Returns its path, or None if nothing was pending."""
+        with self._lock:
+            return self._write() if self._pending else None
+
+    def _write(self):
+        batch = concat(self._pending)
+        now = time.gmtime()
+        part = os.path.join(self.root, time.strftime("date=%Y-%m-%d", now))
+        os.makedirs(part, exist_ok=True)
+        path = os.path.join(part, f"part-{time.strftime('%H%M%S', now)}-{time.time_ns()}.npz")
+        with open(path + ".tmp", "wb") as f: np.savez_compressed(f, **batch)
+        os.replace(path + ".tmp", path)
+        self.written += len(self._pending)
+        self._pending, self._oldest = [], None  # cleared only once the batch is on disk
+        return path
+
+
+# ==========================================
+# STREAMING LOADER
+# ==========================================
+def partitions(root, since=None, until=None):
+    """Date partition directories, oldest first, limited to ``since <= date <= until`` (ISO dates, inclusive)."""
+    if not os.path.isdir(root): return []
+    days = sorted(name[len("date="):] for name in os.listdir(root) if name.startswith("date="))
+    return [os.path.join(root, "date=" + d) for d in days if (since is None or d >= str(since)) and (until is None or d <= str(until))]
+
+
+def iter_batches(root, columns, since=None, until=None):
+    """Yield one ``{column: array}`` dict per archived batch, inflating only ``columns``."""
+    for part in partitions(root, since, until):
+        for path in sorted(glob.glob(os.path.join(part, "*.npz"))):
+            with np.load(path) as z: yield {c: z[c] for c in columns}
+
+
+def _add(total, part):
+    """Elementwise sum of two 1-D arrays of different lengths (bincounts of batches with different ranges)."""
+    if len(part) > len(total): total, part = part, total
+    total = total.astype(np.float64)
+    total[:len(part)] += part
+    return total
+
+
+# ==========================================
+# AGGREGATE QUERIES
+# ==========================================
+def sabotage_rate_by_role(root, since=None, until=None):
+    """Share of player-rounds spent sabotaging, per role: ``{role: (rate, player-rounds)}``."""
+    k = len(ROLE_NAMES)
+    seen, sabotaged = np.zeros(k), np.zeros(k)
+    for b in iter_batches(root, ["rounds.role", "rounds.sabotage"], since, until):
+        seen += np.bincount(b["rounds.role"], minlength=k)
+        sabotaged += np.bincount(b["rounds.role"], weights=b["rounds.sabotage"] >= 0, minlength=k)
+    return {ROLE_NAMES[c]: (sabotaged[c] / seen[c], int(seen[c])) for c in sorted(ROLE_NAMES) if seen[c]}
+
+
+def detective_clue_accuracy(root, since=None, until=None):
+    """How Detectives played their wiretap clue against everyone else, over rounds 2 onwards.
+
+    A round's clue is the previous round's total sabotage count, "heavy" once it reaches the
+    number of vaults. Returns ``{(group, clue): {"rounds", "hold_rate", "hit_rate"}}`` for
+    group "Detective" / "Others" and clue "heavy" / "light"; ``hit_rate`` is the share of
+    investments that landed in a vault that paid out.
+    """
+    columns = ["games.vaults", "games.rounds", "rounds.game", "rounds.round", "rounds.role", "rounds.invest", "rounds.hit",
+               "vaults.game", "vaults.round", "vaults.sabotages"]
+    counts = np.zeros((3, 4))  # rows, holds, hits by key = 2 * not-Detective + light clue
+    for b in iter_batches(root, columns, since, until):
+        width = int(b["games.rounds"].max()) + 1
+        totals = np.bincount(b["vaults.game"].astype(np.int64) * width + b["vaults.round"], weights=b["vaults.sabotages"])
+        later = b["rounds.round"] > 1
+        game = b["rounds.game"][later].astype(np.int64)
+        heavy = totals[game * width + b["rounds.round"][later] - 1] >= b["games.vaults"][game]
+        key = 2 * (b["rounds.role"][later] != engine.DETECTIVE) + ~heavy
+        counts[0] += np.bincount(key, minlength=4)
+        counts[1] += np.bincount(key, weights=b["rounds.invest"][later] < 0, minlength=4)
+        counts[2] += np.bincount(key, weights=b["rounds.hit"][later], minlength=4)
+    out = {}
+    for key, (group, clue) in enumerate((("Detective", "heavy"), ("Detective", "light"), ("Others", "heavy"), ("Others", "light"))):
+        rows, holds, hits = counts[:, key]
+        if rows: out[group, clue] = {"rounds": int(rows), "hold_rate": holds / rows, "hit_rate": hits / (rows - holds) if rows > holds else 0.0}
+    return out
+
+
+def message_spend_by_rank(root, since=None, until=None):
+    """Mean message spend per final rank and its correlation with rank: ``({rank: (mean spend, seats)}, pearson r)``.
+
+    Rank 1 is the top of the leaderboard, so a negative r means bigger spenders finished higher.
+    """
+    seats, spend = np.zeros(0), np.zeros(0)
+    sums = np.zeros(6)  # n, sum x, sum y, sum xx, sum yy, sum xy with x = spend, y = rank
+    for b in iter_batches(root, ["seats.rank", "seats.spend"], since, until):
+        x, y = b["seats.spend"].astype(np.float64), b["seats.rank"].astype(np.float64)
+        seats = _add(seats, np.bincount(b["seats.rank"]))
+        spend = _add(spend, np.bincount(b["seats.rank"], weights=x))
+        sums += (len(x), x.sum(), y.sum(), x @ x, y @ y, x @ y)
+    n, sx, sy, sxx, syy, sxy = sums
+    var = (n * sxx - sx * sx) * (n * syy - sy * sy)
+    corr = (n * sxy - sx * sy) / np.sqrt(var) if var > 0 else 0.0
+    return {rank: (spend[rank] / seats[rank], int(seats[rank])) for rank in np.flatnonzero(seats).tolist()}, float(corr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--root", default=os.path.join(os.environ.get("SYNDICATE_DATA_DIR", "data"), "analytics"))
+    parser.add_argument("--since", help="first date partition to read, YYYY-MM-DD")
+    parser.add_argument("--until", help="last date partition to read, YYYY-MM-DD")
+    args = parser.parse_args(argv)
+    where = (args.root, args.since, args.until)
+
+    t0 = time.perf_counter()
+    rates = sabotage_rate_by_role(*where)
+    print(f"\nsabotage rate by role ({time.perf_counter() - t0:.2f}s)")
+    for role, (rate, n) in rates.items(): print(f"  {role:<12} {rate:>6.1%}  ({n:,} player-rounds)")
+
+    t0 = time.perf_counter()
+    clues = detective_clue_accuracy(*where)
+    print(f"\nplay after the wiretap clue, rounds 2+ ({time.perf_counter() - t0:.2f}s)")
+    for (group, clue), s in clues.items(): print(f"  {group:<10} {clue:<6} held {s['hold_rate']:>6.1%}  hit {s['hit_rate']:>6.1%}  ({s['rounds']:,} player-rounds)")
+
+    t0 = time.perf_counter()
+    by_rank, corr = message_spend_by_rank(*where)
+    print(f"\nmessage spend by final rank ({time.perf_counter() - t0:.2f}s), spend/rank r = {corr:+.3f}")
+    for rank, (mean, n) in by_rank.items(): print(f"  #{rank:<3} ₹{mean:>6.2f}  ({n:,} seats)")
+    return 0
+
+
+if __name__ == "__main__": sys.exit(main())
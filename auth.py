@@ -0,0 +1,72 @@
+"""Process-wide PIN index: hashed PIN -> (table code, seat) across every live table.
+
+PINs are keyed by HMAC-SHA256 under a per-process secret, so the index holds no plaintext
+and a login is one dict probe however many seats are open. A PIN belongs to at most one
+seat on the whole server, which is what lets a PIN alone identify its table. The hash is
+deliberately cheap; brute force is held off by per-session backoff (see ``backoff``),
+which turns a throttled attempt away before any hashing happens.
+"""
+import hashlib
+import hmac
+import secrets
+import threading
+
+from lobby import CODE_ALPHABET
+
+HOST = "HOST"  # the seat of a table's host; players' seats are their pids
+PIN_LENGTH = 6
+
+
+def new_pin():
+    return "".join(secrets.choice(CODE_ALPHABET) for _ in range(PIN_LENGTH))
+
+
+def backoff(failures, free=3, cap=300.0):
+    """Seconds a session must wait after ``failures`` consecutive bad PINs."""
+    return 0.0 if failures < free else min(cap, 2.0 ** (failures - free))
+
+
+class PinIndex:
+    def __init__(self, secret=None):
+        self._key = secret or secrets.token_bytes(32)
+        self._owner = {}    # digest -> (code, seat)
+        self._by_code = {}  # code -> {seat: digest}
+        self._lock = threading.Lock()
+
+    def __len__(self): return len(self._owner)
+
+    def _digest(self, pin): return hmac.new(self._key, pin.encode(), hashlib.sha256).digest()
+
+    def claim(self, code, seat, pin):
+        """Point ``pin`` at a seat, releasing the seat's previous PIN. False if any other seat holds it."""
+        digest = self._digest(pin)
+        with self._lock:
+            owner = self._owner.get(digest)
+            if owner is not None and owner != (code, seat): return False
+            seats = self._by_code.setdefault(code, {})
+            old = seats.get(seat)
+            if old is not None and old != digest: del self._owner[old]
+            seats[seat], self._owner[digest] = digest, (code, seat)
+        return True
+
+    def register(self, code, game):
+        """Index every PIN of a table. PINs already taken elsewhere are re-rolled through the table's commands."""
+        for pid, pin in [(HOST, game.host_pin)] + sorted(game.player_pins.items()):
+            while not self.claim(code, pid, pin):
+                pin = new_pin()
+                if pid == HOST: game.submit("set_host_pin", pin=pin)
+                else: game.submit("set_pin", pid=pid, pin=pin)
+
+    def drop(self, code):
+        with self._lock:
+            for digest in self._by_code.pop(code, {}).values(): self._owner.pop(digest, None)
+
+    def lookup(self, pin, code=None):
+        """Return (code, seat) for ``pin``, or None. With ``code``, the PIN must belong to that table.
+
+        A plain dict probe is safe here: keys are HMAC digests under a secret key, so an attacker
+        cannot steer which digest a guess hashes to, and probe timing reveals nothing about stored PINs.
+        """
+        with self._lock: owner = self._owner.get(self._digest(pin))
+        if owner is None or (code is not None and owner[0] != code): return None
+        return owner
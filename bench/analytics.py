@@ -0,0 +1,93 @@
+"""Time the archive's aggregate queries over millions of archived player-rounds.
+
+    python -m bench.analytics --games 256 --rounds 5000000
+
+Plays ``--games`` real bot games through ``GameState`` into a ``GameArchive`` (one batch),
+checks each query against the same numbers counted straight from the games' history, then
+copies that batch across date partitions until the archive holds ``--rounds`` player-rounds
+and times every query over the lot. Exits 1 if a check fails or a query takes longer than
+``--budget`` seconds.
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+import archive
+from bots import STRATEGIES, act
+from game import GameState
+
+
+def play(n_games, rng, store):
+    games = []
+    for _ in range(n_games):
+        g = GameState()
+        g.listeners.append(store.on_command)
+        seats = {pid: STRATEGIES[rng.choice(list(STRATEGIES))]() for pid in g.roster.pids}
+        g.submit("shuffle_roles", seed=rng.getrandbits(63))
+        while not g.game_over:
+            act(g, rng, seats)
+            g.submit("resolve_round", expected_round=g.round, seed=rng.getrandbits(63))
+        games.append(g)
+    return games
+
+
+def check(root, games):
+    """Recount sabotage rates and rank spend straight from history and the rosters; return the mismatches."""
+    seen, sabotaged, spend = {}, {}, {}
+    for g in games:
+        for h in g.history:
+            for role, sab in zip(h["players"]["role"], h["players"]["sabotage_choice"]):
+                seen[role] = seen.get(role, 0) + 1
+                sabotaged[role] = sabotaged.get(role, 0) + (sab != "None")
+        for rank, i in enumerate(g.roster.ranking().tolist(), 1): spend.setdefault(rank, []).append(g.roster.message_spend[i])
+    bad = [role for role, (rate, n) in archive.sabotage_rate_by_role(root).items() if n != seen[role] or abs(rate - sabotaged[role] / n) > 1e-9]
+    by_rank, _ = archive.message_spend_by_rank(root)
+    bad += [f"rank {rank}" for rank, (mean, n) in by_rank.items() if n != len(spend[rank]) or abs(mean - sum(spend[rank]) / n) > 1e-4]
+    return bad
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--games", type=int, default=256)
+    parser.add_argument("--rounds", type=int, default=5_000_000, help="player-rounds to fill the archive with")
+    parser.add_argument("--days", type=int, default=30, help="date partitions to spread the copies over")
+    parser.add_argument("--budget", type=float, default=10.0, help="seconds allowed per query")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    root = tempfile.mkdtemp(prefix="syndicate-analytics-")
+    try:
+        store = archive.GameArchive(root, batch_games=args.games + 1)  # written by the flush below, as one batch
+        t0 = time.perf_counter()
+        games = play(args.games, random.Random(args.seed), store)
+        source = store.flush()
+        print(f"{args.games} games played and archived in {time.perf_counter() - t0:.1f}s ({os.path.getsize(source) / 1024:,.0f} KB per batch)")
+        bad = check(root, games)
+        print("query check: " + ("OK" if not bad else f"MISMATCH {bad}"))
+
+        per_batch = sum(len(g.history) * len(g.roster) for g in games)
+        copies = -(-args.rounds // per_batch)
+        for i in range(1, copies):
+            part = os.path.join(root, f"date=2026-01-{i % args.days + 1:02d}")
+            os.makedirs(part, exist_ok=True)
+            shutil.copyfile(source, os.path.join(part, f"part-000000-{i}.npz"))
+        size = sum(os.path.getsize(os.path.join(p, f)) for p in archive.partitions(root) for f in os.listdir(p))
+        print(f"archive: {copies:,} batches, {copies * per_batch:,} player-rounds, {copies * args.games:,} games, {size / 2**20:,.1f} MB on disk")
+
+        slow = []
+        for query in (archive.sabotage_rate_by_role, archive.detective_clue_accuracy, archive.message_spend_by_rank):
+            t0 = time.perf_counter()
+            query(root)
+            secs = time.perf_counter() - t0
+            print(f"  {query.__name__:<26} {secs:>6.2f}s  ({copies * per_batch / secs / 1e6:,.1f}M player-rounds/s)")
+            if secs > args.budget: slow.append(query.__name__)
+    finally: shutil.rmtree(root, ignore_errors=True)
+    ok = not bad and not slow
+    print("OK" if ok else f"FAIL: {bad + slow}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__": sys.exit(main())
@@ -0,0 +1,166 @@
+"""Headless load and latency benchmark: one host and N player sessions through full games.
+
+    python -m bench.load --players 5 --games 3
+    python -m bench.load --save      # record bench/baseline.json from this run
+    python -m bench.load --check     # exit 1 if any metric is past its baseline threshold
+
+Drives app.py through Streamlit's AppTest harness. AppTest runs one script at a time, so the
+sessions are interleaved tick by tick against the same in-process tables, much as one server
+process serializes them. Every rerun is timed and bucketed by view and tab: login, the
+player's Terminal (lock-in), Comms (send, inbox) and Ledger (paging back), and the host's
+dashboard refresh, audit and resolve click. ``resolve_round`` itself is timed separately so
+engine cost is not lost in rerun noise.
+
+The regression gate compares medians, and only for buckets with at least ``--min-samples``
+reruns: a p95 over a handful of samples is just the slowest one, which swings run to run.
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+import warnings
+from collections import defaultdict
+
+import numpy as np
+from streamlit.testing.v1 import AppTest
+
+import game as game_module
+from lobby import deep_sizeof
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+INVEST = ["🏦 Vault A", "🏦 Vault B", "🏦 Vault C", "💵 Hold Cash"]
+SABOTAGE = ["🛑 None", "🛑 None", "🧨 Vault A", "🧨 Vault B"]
+
+
+class Load:
+    def __init__(self, timeout):
+        self.timeout = timeout
+        self.samples = defaultdict(list)
+
+    def timed(self, key, at, action=None):
+        """Run ``action`` (an element interaction, or a plain rerun) and record how long the rerun took."""
+        t0 = time.perf_counter()
+        (action or at.run)()
+        self.samples[key].append(time.perf_counter() - t0)
+        if at.exception: raise RuntimeError(f"{key}: {at.exception[0].value}")
+        return at
+
+    def session(self):
+        return AppTest.from_file(APP, default_timeout=self.timeout)
+
+    def open_table(self, n_players):
+        host = self.session().run()
+        host.number_input[0].set_value(n_players)
+        host.run()
+        self.timed("host: open table", host, next(b for b in host.button if "New Table" in b.label).click().run)
+        code = host.session_state["lobby_code"]
+        if n_players <= 10: return host, code, [host.text_input(key=f"pin_{pid}").value for pid in range(1, n_players + 1)]
+        pins = []
+        for pid in range(1, n_players + 1):
+            host.selectbox[0].set_value(pid).run()
+            pins.append(host.text_input(key=f"pin_{pid}").value)
+        return host, code, pins
+
+    def login(self, code, pin):
+        at = self.session().run()
+        at.text_input[0].input(code)
+        at.text_input[1].input(pin)
+        return self.timed("login", at, at.button[0].click().run)
+
+    def play(self, n_players, rng):
+        host, code, pins = self.open_table(n_players)
+        players = [self.login(code, pin) for pin in pins]
+        for at in players: self.timed("player: comms (open inbox)", at, next(b for b in at.button if "Reveal" in b.label).click().run)
+
+        rounds = 0
+        while not any("ENDGAME" in t.value for t in host.title):
+            rounds += 1
+            for at in players:
+                if not at.radio: self.timed("player: refresh", at)  # still showing last round's "locked" screen
+                at.radio[0].set_value(rng.choice(INVEST))
+                at.radio[1].set_value(rng.choice(SABOTAGE))
+                self.timed("player: terminal (lock in)", at, at.button(key="FormSubmitter:action_form-🔒 Execute Directives").click().run)
+            for at in players:
+                if rng.random() < 0.5:
+                    next(t for t in at.text_input if t.label == "Payload:").input(f"deal? r{rounds}")
+                    self.timed("player: comms (send)", at, next(b for b in at.button if b.label.startswith("Send")).click().run)
+                else: self.timed("player: refresh", at)
+            for at in players[: max(1, len(players) // 4)]:
+                pager = [n for n in at.number_input if n.label == "Show rounds up to"]
+                if pager: self.timed("player: ledger (page back)", at, pager[0].set_value(1).run)
+            self.timed("host: refresh", host)
+            audit = [n for n in host.number_input if n.label == "Select Past Round"]
+            if audit: self.timed("host: audit", host, audit[0].set_value(1).run)
+            self.timed("host: resolve", host, next(b for b in host.button if "RESOLVE" in b.label).click().run)
+        for at in players: self.timed("player: endgame", at)
+        return [deep_sizeof({k: at.session_state[k] for k in at.session_state}) for at in [host] + players]
+
+
+def percentiles(samples):
+    return {key: [float(v) * 1000 for v in np.percentile(values, [50, 95, 99])] + [len(values)] for key, values in sorted(samples.items())}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--players", type=int, default=5)
+    parser.add_argument("--games", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--save", action="store_true", help="write this run's metrics and thresholds to the baseline")
+    parser.add_argument("--check", action="store_true", help="compare this run against the baseline's thresholds")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="threshold = max(baseline * tolerance, baseline + floor)")
+    parser.add_argument("--floor-ms", type=float, default=10.0)
+    parser.add_argument("--floor-kb", type=float, default=2.0, help="absolute slack for the session-state size")
+    parser.add_argument("--min-samples", type=int, default=10, help="buckets with fewer reruns are reported but not gated")
+    args = parser.parse_args(argv)
+    warnings.filterwarnings("ignore")
+    logging.disable(logging.WARNING)  # Streamlit deprecation chatter on every rerun
+    os.environ["SYNDICATE_DATA_DIR"] = tempfile.mkdtemp(prefix="syndicate-load-")
+
+    load, rng = Load(args.timeout), random.Random(args.seed)
+    resolve = game_module.COMMANDS["resolve_round"]
+    def timed_resolve(*a, **kw):
+        t0 = time.perf_counter()
+        try: return resolve(*a, **kw)
+        finally: load.samples["resolve_round (engine)"].append(time.perf_counter() - t0)
+    game_module.COMMANDS["resolve_round"] = timed_resolve
+
+    load.session().run()  # warm-up: pay Streamlit's import and cache start-up before measuring memory
+    rss0, session_bytes = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, []
+    try:
+        for _ in range(args.games): session_bytes += load.play(args.players, rng)
+    finally: game_module.COMMANDS["resolve_round"] = resolve
+    rss_per_session = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss0) / len(session_bytes)
+
+    stats = percentiles(load.samples)
+    print(f"{args.games} game(s), 1 host + {args.players} players each")
+    print(f"{'view / tab':<30} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'reruns':>7}")
+    for key, (p50, p95, p99, n) in stats.items(): print(f"{key:<30} {p50:>8.1f} {p95:>8.1f} {p99:>8.1f} {n:>7}")
+    print(f"session state: median {np.median(session_bytes) / 1024:.1f} KB, max {max(session_bytes) / 1024:.1f} KB; peak RSS growth ~{rss_per_session:,.0f} KB per session")
+
+    metrics = {f"{key} p50_ms": round(p50, 2) for key, (p50, _, _, n) in stats.items() if n >= args.min_samples}
+    metrics["session state KB"] = round(max(session_bytes) / 1024, 2)
+    if args.save:
+        floor = lambda k: args.floor_kb if k.endswith(" KB") else args.floor_ms
+        baseline = {"config": {"players": args.players, "games": args.games, "seed": args.seed},
+                    "metrics": {k: {"baseline": v, "max": round(max(v * args.tolerance, v + floor(k)), 2)} for k, v in metrics.items()}}
+        with open(BASELINE, "w", encoding="utf-8") as f: json.dump(baseline, f, indent=2)
+        print(f"baseline written to {BASELINE}")
+    if args.check:
+        with open(BASELINE, encoding="utf-8") as f: baseline = json.load(f)
+        if baseline["config"] != {"players": args.players, "games": args.games, "seed": args.seed}:
+            print(f"note: baseline was recorded with {baseline['config']}; numbers may not be comparable")
+        over = [(k, metrics[k], m["max"]) for k, m in baseline["metrics"].items() if k in metrics and metrics[k] > m["max"]]
+        for k, v, limit in over: print(f"FAIL {k}: {v} > {limit}")
+        print("OK" if not over else f"{len(over)} metric(s) over threshold")
+        return 1 if over else 0
+    return 0
+
+
+if __name__ == "__main__": sys.exit(main())
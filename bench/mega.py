@@ -0,0 +1,43 @@
+"""Round-resolution time and memory per table as the roster grows.
+
+    python -m bench.mega --sizes 5x3 50x5 200x20 1000x20
+
+Each size plays a full game with every seat locked in each round and reports the
+median ``resolve_round`` time and the table's approximate footprint afterwards.
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+
+from game import GameState
+from lobby import deep_sizeof
+
+
+def measure(n_players, n_vaults, rng):
+    game = GameState(n_players=n_players, n_vaults=n_vaults)
+    invest_opts, sabotage_opts = game.vault_names + ["Hold Cash"], ["None"] + game.vault_names
+    timings = []
+    for _ in range(game.max_rounds):
+        for pid in game.roster.pids: game.submit("lock_in", pid=pid, invest=rng.choice(invest_opts), sabotage=rng.choice(sabotage_opts))
+        t0 = time.perf_counter()
+        game.submit("resolve_round", expected_round=game.round)
+        timings.append(time.perf_counter() - t0)
+    return statistics.median(timings), deep_sizeof(game)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", default=["5x3", "50x5", "200x20", "1000x20"], help="PLAYERSxVAULTS")
+    args = parser.parse_args(argv)
+    rng = random.Random(0)
+    print(f"{'players':>8} {'vaults':>7} {'resolve ms':>11} {'table KB':>9} {'B/player':>9}")
+    for size in args.sizes:
+        n_players, n_vaults = map(int, size.split("x"))
+        secs, size_bytes = measure(n_players, n_vaults, rng)
+        print(f"{n_players:>8} {n_vaults:>7} {secs * 1000:>11.2f} {size_bytes / 1024:>9.1f} {size_bytes / n_players:>9.0f}")
+    return 0
+
+
+if __name__ == "__main__": sys.exit(main())
@@ -0,0 +1,98 @@
+"""Check ``engine.resolve`` and ``resolve_round`` against hand-computed outcomes of the original rules.
+
+    python -m bench.rules
+
+Each case fixes the dice (scripted d100 rolls and multipliers), so the expected cash is
+worked out by hand from the rules: 90% base chance, -25 per sabotage, 10% floor, the pool
+split evenly among a vault's investors, ₹10L salary, one ₹10L Mastermind bonus per failed
+vault (empty vaults included) and a ₹10L bailout at cash <= 0. A fixed-seed sweep then checks
+the chance ladder and multiplier spread statistically, and one seeded round through
+``GameState`` checks the live table runs exactly the same engine.
+"""
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+
+import engine
+from engine import ASSOCIATE as A, DETECTIVE as D, MASTERMIND as M, NO_VAULT as HOLD
+from game import GameState
+
+
+class Dice:
+    """Stands in for the ``np.random.Generator``: hands out the scripted rolls and multipliers."""
+
+    def __init__(self, rolls, multipliers): self.rolls, self.multipliers = rolls, multipliers
+
+    def integers(self, low, high, size): return np.array(self.rolls).reshape(size)
+
+    def choice(self, values, size): return np.array(self.multipliers).reshape(size)
+
+
+CASES = [
+    SimpleNamespace(
+        name="empty vault fails: Mastermind still paid; pool split per investor; rolls on the chance boundary succeed",
+        cash=[30, 30, 30, 30, 30], roles=[M, D, A, A, A], invest=[HOLD, 0, 0, 1, HOLD], sabotage=[1, HOLD, HOLD, HOLD, HOLD],
+        n_vaults=3, dice=Dice([90, 65, 91], [2.0, 1.5, 2.5]),
+        success=[True, True, False], payout=[20, 15, 0], cash_after=[50, 50, 50, 45, 40], bankrupt=[False] * 5),
+    SimpleNamespace(
+        name="every vault sabotaged to the 10% floor: a roll of 10 succeeds, 11 fails",
+        cash=[30] * 8, roles=[M, D, A, A, A, A, A, A], invest=[HOLD, 0, 0, 0, 1, 1, 1, 1], sabotage=[0, 0, 0, 0, 1, 1, 1, 1],
+        n_vaults=2, dice=Dice([10, 11], [2.5, 2.0]),
+        success=[True, False], payout=[25, 0], cash_after=[50, 55, 55, 55, 30, 30, 30, 30], bankrupt=[False] * 8),
+    SimpleNamespace(
+        name="bankruptcy: exactly ₹0 after salary is bailed out to ₹10L, ₹0.5L is not",
+        cash=[0, 0, 0.5], roles=[M, D, A], invest=[0, 0, 0], sabotage=[HOLD, HOLD, HOLD],
+        n_vaults=1, dice=Dice([100], [1.5]),
+        success=[False], payout=[0], cash_after=[10, 10, 0.5], bankrupt=[False, True, False]),
+]
+
+
+def check_case(case):
+    out = engine.resolve(np.array([case.cash], dtype=float), np.array([case.roles]), np.array([case.invest]),
+                         np.array([case.sabotage]), case.n_vaults, case.dice)
+    got = {"success": out.success[0].tolist(), "payout": out.payout[0].tolist(), "cash_after": out.cash[0].tolist(), "bankrupt": out.bankrupt[0].tolist()}
+    want = {k: getattr(case, k) for k in got}
+    return [f"{k}: got {got[k]}, want {want[k]}" for k in got if not np.allclose(np.array(got[k], dtype=float), np.array(want[k], dtype=float))]
+
+
+def check_ladder(games=200_000, seed=0, tol=0.005):
+    """Success rate for 0-4 sabotages on one vault should be 90/65/40/15/10%, multipliers uniform over the three."""
+    rng, bad = np.random.default_rng(seed), []
+    for sabs, want in enumerate((0.90, 0.65, 0.40, 0.15, 0.10)):
+        out = engine.resolve(np.full((games, 4), 30.0), np.full((games, 4), A), np.zeros((games, 4), dtype=int),
+                             np.where(np.arange(4) < sabs, 0, HOLD)[None].repeat(games, 0), 1, rng)
+        if abs(out.success.mean() - want) > tol: bad.append(f"{sabs} sabotages: success {out.success.mean():.4f}, want {want}")
+        shares = [(out.multiplier[out.success] == m).mean() for m in engine.DEFAULT_RULES.multipliers]
+        if max(abs(s - 1 / 3) for s in shares) > 0.01: bad.append(f"{sabs} sabotages: multiplier shares {shares}")
+    return bad
+
+
+def check_live(seed=42):
+    """One seeded round through ``GameState`` must match ``engine.resolve`` on the same inputs and seed."""
+    game = GameState()
+    game.submit("shuffle_roles", seed=seed)
+    picks = [("Vault A", "None"), ("Vault A", "Vault B"), ("Vault B", "None"), ("Hold Cash", "Vault A"), ("Vault C", "None")]
+    for pid, (invest, sabotage) in zip(game.roster.pids, picks): game.submit("lock_in", pid=pid, invest=invest, sabotage=sabotage)
+    r = game.roster
+    out = engine.resolve(r.cash[None], r.role[None], r.invest[None], r.sabotage[None], len(game.vault_names), np.random.default_rng(seed))
+    game.submit("resolve_round", seed=seed)
+    return [] if np.array_equal(game.roster.cash, out.cash[0]) else [f"live cash {game.roster.cash.tolist()} != engine {out.cash[0].tolist()}"]
+
+
+def main():
+    failures = 0
+    for case in CASES:
+        bad = check_case(case)
+        failures += bool(bad)
+        print(("ok   " if not bad else "FAIL ") + case.name)
+        for line in bad: print("     " + line)
+    for title, bad in (("chance ladder and multipliers (seed 0)", check_ladder()), ("live table matches the engine (seed 42)", check_live())):
+        failures += bool(bad)
+        print(("ok   " if not bad else "FAIL ") + title)
+        for line in bad: print("     " + line)
+    print("OK" if not failures else f"{failures} check(s) failed")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__": sys.exit(main())
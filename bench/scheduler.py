@@ -0,0 +1,127 @@
+"""Drive hundreds of tables through the single round-scheduler thread.
+
+    python -m bench.scheduler --tables 300 --timed 200
+
+Phase 1 seats bots in every chair of ``--tables`` auto-resolving tables while racing
+"host" threads also click resolve, and checks every round of every game resolved exactly
+once. Phase 2 opens ``--timed`` tables whose players never lock in, with a 1s round clock,
+and checks each round closes at its deadline with everyone holding cash, reporting how
+late the wheel fired. A last check sets the clock mid-round and makes sure the deadline lands
+a full round length ahead, so the wheel never closes a round the host has just timed.
+"""
+import argparse
+import sys
+import threading
+import time
+
+import numpy as np
+
+from bots import STRATEGIES
+from game import GameState
+from scheduler import RoundScheduler
+
+
+def wait(games, limit):
+    t0 = time.perf_counter()
+    while not all(g.game_over for g in games):
+        if time.perf_counter() - t0 > limit: return None
+        time.sleep(0.01)
+    return time.perf_counter() - t0
+
+
+def resolved_once(game):
+    return [h["round"] for h in game.history] == list(range(1, game.max_rounds + 1))
+
+
+def auto_phase(n_tables, racers):
+    scheduler = RoundScheduler()
+    games = [GameState() for _ in range(n_tables)]
+    stop = threading.Event()
+
+    def host_clicks():
+        while not stop.is_set():
+            for g in games:
+                snap = g.snapshot()
+                if not snap.game_over and snap.roster.ready().all(): g.submit("resolve_round", expected_round=snap.round)
+            time.sleep(0.001)
+
+    hosts = [threading.Thread(target=host_clicks) for _ in range(racers)]
+    for t in hosts: t.start()
+    for i, g in enumerate(games):
+        g.submit("shuffle_roles")
+        g.submit("set_round_clock", auto_resolve=True, seconds=0)
+        for pid, name in zip(g.roster.pids, list(STRATEGIES) * len(g.roster)): g.submit("set_bot", pid=pid, strategy=name)
+        scheduler.watch(f"T{i:04d}", g)
+    secs = wait(games, 120)
+    stop.set()
+    for t in hosts: t.join()
+    scheduler.close()
+    bad = [i for i, g in enumerate(games) if not resolved_once(g)]
+    return secs, scheduler.resolved, sum(len(g.history) for g in games), bad
+
+
+def timed_phase(n_tables, seconds=1, rounds=2):
+    late = []
+    scheduler = RoundScheduler(on_resolved=lambda code, game, round_no, deadline: late.append(time.time() - deadline) if deadline else None)
+    games = [GameState(max_rounds=rounds) for _ in range(n_tables)]
+    for i, g in enumerate(games):
+        g.submit("set_round_clock", auto_resolve=True, seconds=seconds)
+        scheduler.watch(f"D{i:04d}", g)
+    secs = wait(games, rounds * seconds + 30)
+    scheduler.close()
+    held = all(set(h["players"]["invest_choice"]) == {"Hold Cash"} and set(h["players"]["sabotage_choice"]) == {"None"} for g in games for h in g.history)
+    bad = [i for i, g in enumerate(games) if not resolved_once(g)]
+    return secs, np.array(late), held, bad
+
+
+def clock_check(now=1_000_000.0, seconds=15):
+    """Start a clock in round 2, long after the round opened, then toggle auto-resolve; return the mismatches."""
+    game, bad = GameState(), []
+    game.submit("resolve_round", ts=now - 100)  # round 2 opened 100s ago, with no clock
+    game.submit("set_round_clock", auto_resolve=False, seconds=seconds, ts=now)
+    if game.round_deadline != now + seconds: bad.append(f"clock set mid-round: deadline {game.round_deadline - now:+.0f}s from now, want +{seconds}s")
+    game.submit("set_round_clock", auto_resolve=True, seconds=seconds, ts=now + 10)
+    if game.round_deadline != now + seconds: bad.append("toggling auto-resolve moved the deadline")
+
+    scheduler = RoundScheduler()  # and live: a table timed just now must still be open a moment later
+    game = GameState()
+    game.submit("resolve_round", ts=time.time() - 100)
+    game.submit("set_round_clock", auto_resolve=True, seconds=seconds)
+    scheduler.watch("C0000", game)
+    time.sleep(3 * scheduler.tick)
+    scheduler.close()
+    if game.round != 2: bad.append("the wheel closed round 2 straight after its clock was set")
+    return bad
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tables", type=int, default=300)
+    parser.add_argument("--timed", type=int, default=200)
+    parser.add_argument("--racers", type=int, default=4)
+    args = parser.parse_args(argv)
+    ok = True
+
+    secs, by_scheduler, total, bad = auto_phase(args.tables, args.racers)
+    if secs is None: print("FAIL: phase 1 tables did not finish"); return 1
+    print(f"phase 1: {args.tables} bot tables, {total:,} rounds in {secs:.2f}s ({total / secs:,.0f} rounds/s), "
+          f"{by_scheduler:,} by the scheduler and {total - by_scheduler:,} by {args.racers} racing hosts")
+    for i in bad: print(f"FAIL table {i}: rounds not resolved exactly once")
+    ok &= not bad
+
+    secs, late, held, bad = timed_phase(args.timed)
+    if secs is None: print("FAIL: phase 2 tables did not finish"); return 1
+    print(f"phase 2: {args.timed} idle tables closed {len(late)} rounds at their deadlines; "
+          f"late by p50 {np.percentile(late, 50) * 1000:.0f} ms, p99 {np.percentile(late, 99) * 1000:.0f} ms, max {late.max() * 1000:.0f} ms")
+    if not held: print("FAIL: a seat that never locked in did not hold cash")
+    for i in bad: print(f"FAIL timed table {i}: rounds not resolved exactly once")
+    ok &= held and not bad and len(late) == 2 * args.timed
+
+    bad = clock_check()
+    print("clock check: " + ("OK" if not bad else "; ".join(bad)))
+    ok &= not bad
+    print("OK" if ok else "FAIL")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__": sys.exit(main())
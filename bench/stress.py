@@ -0,0 +1,116 @@
+"""Hammer one table's command queue from many threads and check nothing is lost or double spent.
+
+    python -m bench.stress --threads 32 --ops 2000
+
+Phase 1 races ₹1L message sends against lock-ins, round resolutions, renames and host
+messages. Seats only ever hold cash, so every resolved round pays out salary (plus the
+Mastermind's bonuses), which keeps the sends funded for the whole run. Reader threads
+verify that every snapshot conserves cash: sum(cash) + cost * delivered messages must
+equal the starting float plus every resolved round's net change. Phase 2 races
+``resolve_round`` clicks for every round of a fresh table and checks each round resolves
+exactly once.
+"""
+import argparse
+import random
+import sys
+import threading
+import time
+
+import numpy as np
+
+from game import GameState
+
+
+def hammer(game, threads, ops, seed):
+    pids = list(game.roster.pids)
+    start_cash = dict(zip(pids, game.roster.cash.tolist()))
+    start_total = sum(start_cash.values())
+    cost = game.rules.message_cost
+    sent, attempts = {pid: 0 for pid in pids}, [0]
+    sent_lock, stop, errors = threading.Lock(), threading.Event(), []
+
+    def writer(n):
+        try: _writer(n)
+        except Exception as e: errors.append(f"writer {n}: {e!r}")
+
+    def _writer(n):
+        rng = random.Random(seed + n)
+        for _ in range(ops):
+            pid = rng.choice(pids)
+            roll = rng.random()
+            if roll < 0.6:
+                target = rng.choice([p for p in pids if p != pid])
+                ok = game.submit("send_message", sender=pid, target=target, text=f"t{n}")
+                with sent_lock:
+                    attempts[0] += 1
+                    sent[pid] += bool(ok)
+            elif roll < 0.8: game.submit("lock_in", pid=pid, invest="Hold Cash", sabotage=rng.choice(game.vault_names + ["None"]))
+            elif roll < 0.9: game.submit("resolve_round", expected_round=game.snapshot().round)
+            elif roll < 0.95: game.submit("rename", pid=pid, name=f"Player {pid}.{n}")
+            else: game.submit("host_message", target=pid, text="ping")
+
+    def reader():
+        seen, paid = 0, 0.0  # rounds already summed, and what they paid out in total
+        while not stop.wait(0.001):  # a spinning reader would win the GIL back on every numpy call a resolve makes
+            snap = game.snapshot()
+            for i in range(seen, len(snap.history)): paid += sum(snap.history[i]["players"]["net_change"])  # index, not slice: O(new rounds)
+            seen = len(snap.history)
+            delivered = snap.messages.kind_counts["player"]
+            total = snap.roster.cash.sum()
+            if abs(total + cost * delivered - start_total - paid) > 1e-6 or (snap.roster.cash < 0).any():
+                errors.append(f"torn snapshot v{snap.version}: cash={total} delivered={delivered} paid={paid}")
+                return
+
+    readers = [threading.Thread(target=reader) for _ in range(4)]
+    writers = [threading.Thread(target=writer, args=(n,)) for n in range(threads)]
+    t0 = time.perf_counter()
+    for t in readers + writers: t.start()
+    for t in writers: t.join()
+    elapsed = time.perf_counter() - t0
+    stop.set()
+    for t in readers: t.join()
+
+    snap = game.snapshot()
+    if any(any(h["players"]["bailout"]) for h in snap.history): errors.append("a seat went bankrupt; the conservation check assumes no bailouts")
+    paid = np.sum([h["players"]["net_change"] for h in snap.history], axis=0) if len(snap.history) else np.zeros(len(pids))
+    for pid in pids:
+        expected = start_cash[pid] - cost * sent[pid] + paid[pid - 1]
+        cash = snap.roster.cash[pid - 1]
+        if abs(cash - expected) > 1e-6: errors.append(f"P{pid}: cash {cash} != {expected}")
+    return errors, elapsed, snap.version, sum(sent.values()), attempts[0]
+
+
+def race_resolution(game, threads):
+    def clicker():
+        while not game.snapshot().game_over:
+            game.submit("resolve_round", expected_round=game.snapshot().round)
+
+    workers = [threading.Thread(target=clicker) for _ in range(threads)]
+    for t in workers: t.start()
+    for t in workers: t.join()
+    rounds = [h["round"] for h in game.snapshot().history]
+    return [] if rounds == list(range(1, game.max_rounds + 1)) else [f"rounds resolved out of order or twice: {rounds}"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--ops", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--min-sends", type=float, default=0.9, help="share of attempted sends that must apply")
+    args = parser.parse_args(argv)
+
+    game = GameState(max_rounds=args.threads * args.ops)  # phase 1 must never run out of rounds
+    errors, elapsed, version, sent, attempts = hammer(game, args.threads, args.ops, args.seed)
+    print(f"phase 1: {args.threads * args.ops:,} commands in {elapsed:.2f}s ({version:,} applied writes, "
+          f"{sent:,} of {attempts:,} sends applied, {len(game.history):,} rounds resolved)")
+    if sent < args.min_sends * attempts: errors.append(f"only {sent:,} of {attempts:,} sends applied; the hammer is mostly rejected no-ops")
+    game = GameState()
+    errors += race_resolution(game, args.threads)
+    print(f"phase 2: {len(game.history)} rounds resolved by {args.threads} racing hosts")
+    for e in errors: print("FAIL", e)
+    print("OK" if not errors else f"{len(errors)} violations")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__": sys.exit(main())
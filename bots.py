@@ -0,0 +1,118 @@
+"""Bot players: a strategy interface, a few built-in strategies, and the glue that seats them.
+
+A strategy sees only what a human in that seat would see (``Observation``: its own cash
+and role, the public ledger of vault results, its newest inbox messages) and returns a
+``Decision`` with vault labels exactly as the Terminal tab submits them. Bots go through
+the same ``lock_in`` / ``send_message`` commands as people, so a bot seat is
+indistinguishable from a human one to the rest of the game, the journal and the engine.
+"""
+from typing import NamedTuple
+
+from messages import CLUE
+
+HOLD, NO_SABOTAGE = "Hold Cash", "None"
+INBOX_WINDOW = 10   # newest messages a bot is shown
+LEDGER_WINDOW = 8   # most recent resolved rounds a bot is shown
+
+
+class Observation(NamedTuple):
+    pid: int
+    role: str
+    round: int
+    max_rounds: int
+    cash: float
+    stake: float
+    names: list
+    vault_names: list
+    inbox: list   # newest first, messages.Message records
+    ledger: list  # oldest first, one {vault: {"status", "multiplier", "payout"}} per round, as the player Ledger shows it
+
+
+class Decision(NamedTuple):
+    invest: str
+    sabotage: str = NO_SABOTAGE
+    messages: tuple = ()  # (target pid, text) pairs, each charged like a human's message
+
+
+def observe(snap, pid, stake):
+    r = snap.roster
+    inbox, _ = snap.messages.page(pid, limit=INBOX_WINDOW)
+    ledger = [{v: {k: res[k] for k in ("status", "multiplier", "payout")} for v, res in h["results"].items()}  # sabotage counts are the Detective's clue, not public
+              for h in snap.history[max(0, len(snap.history) - LEDGER_WINDOW):]]
+    return Observation(pid, r.role_name(pid), snap.round, snap.max_rounds, float(r.cash[pid - 1]), stake,
+                       r.names, snap.vault_names, inbox, ledger)
+
+
+class Strategy:
+    """Subclass and override ``decide``. ``rng`` is a ``random.Random`` owned by the caller, so runs are reproducible."""
+    name = "base"
+
+    def decide(self, obs, rng):
+        raise NotImplementedError
+
+
+def success_rates(obs):
+    """Per-vault share of ledger rounds it paid out, with an optimistic prior for unseen vaults."""
+    return {v: (1 + sum(res[v]["status"] == "SUCCESS" for res in obs.ledger if v in res)) / (1 + len(obs.ledger)) for v in obs.vault_names}
+
+
+class RandomBot(Strategy):
+    name = "random"
+
+    def decide(self, obs, rng):
+        invest = rng.choice(obs.vault_names + [HOLD])
+        return Decision(invest, rng.choice(obs.vault_names) if rng.random() < 0.25 else NO_SABOTAGE)
+
+
+class Cautious(Strategy):
+    """Backs the vault with the best track record, holds cash when a loss would bankrupt it, never sabotages."""
+    name = "cautious"
+
+    def decide(self, obs, rng):
+        if obs.cash <= obs.stake: return Decision(HOLD)
+        rates = success_rates(obs)
+        best = max(rates.values())
+        return Decision(rng.choice([v for v, p in rates.items() if p == best]))
+
+
+class Mole(Cautious):
+    """As Mastermind: sits out, sabotages a vault and talks it up to someone. Otherwise plays like ``Cautious``."""
+    name = "mole"
+
+    def decide(self, obs, rng):
+        if obs.role != "Mastermind": return super().decide(obs, rng)
+        target = rng.choice(obs.vault_names)
+        peers = [pid for pid in range(1, len(obs.names) + 1) if pid != obs.pid]
+        pitch = ((rng.choice(peers), f"{target} is the safe play this round."),) if peers and obs.cash > obs.stake else ()
+        return Decision(HOLD, target, pitch)
+
+
+class Sleuth(Cautious):
+    """As Detective: holds cash after a round with heavy sabotage in the wiretap clue. Otherwise plays like ``Cautious``."""
+    name = "sleuth"
+
+    def decide(self, obs, rng):
+        clue = next((m for m in obs.inbox if m.kind == CLUE), None)
+        if clue is not None and clue.round == obs.round - 1 and clue.data is not None and clue.data >= len(obs.vault_names):
+            return Decision(HOLD)
+        return super().decide(obs, rng)
+
+
+STRATEGIES = {cls.name: cls for cls in (RandomBot, Cautious, Mole, Sleuth)}
+
+
+def act(game, rng, strategies=None):
+    """Lock in every bot seat that has not locked in this round. Returns how many bots acted.
+
+    ``strategies`` maps pid -> Strategy and defaults to the table's own ``bots`` seats.
+    """
+    snap = game.snapshot()
+    if snap.game_over: return 0
+    seats = strategies if strategies is not None else {pid: STRATEGIES[name]() for pid, name in snap.bots.items()}
+    ready, acted = snap.roster.ready(), 0
+    for pid, strategy in seats.items():
+        if ready[pid - 1]: continue
+        decision = strategy.decide(observe(snap, pid, game.rules.stake), rng)
+        for target, text in decision.messages: game.submit("send_message", sender=pid, target=target, text=text)
+        acted += game.submit("lock_in", pid=pid, invest=decision.invest, sabotage=decision.sabotage) is not False
+    return acted
@@ -0,0 +1,135 @@
+"""Pure, headless vault-resolution rules shared by the live game and batch simulations.
+
+Everything here works on NumPy arrays with a leading "game" axis, so the live table
+(one game) and a balance sweep (millions of games) run through the exact same code.
+Vault choices are integer indices into the vault list, with ``NO_VAULT`` meaning
+"Hold Cash" / "None".
+"""
+from dataclasses import dataclass
+from typing import NamedTuple
+
+import numpy as np
+
+# ==========================================
+# 1. RULES & ENCODINGS
+# ==========================================
+NO_VAULT = -1
+MASTERMIND, DETECTIVE, ASSOCIATE = 0, 1, 2
+ROLE_CODES = {"Mastermind": MASTERMIND, "Detective": DETECTIVE, "Associate": ASSOCIATE}
+
+
+@dataclass(frozen=True)
+class Rules:
+    base_chance: int = 90
+    sabotage_penalty: int = 25
+    min_chance: int = 10
+    multipliers: tuple = (1.5, 2.0, 2.5)
+    stake: float = 10.0
+    salary: float = 10.0
+    fail_bonus: float = 10.0
+    bailout: float = 10.0
+    start_cash: float = 30.0
+    message_cost: float = 1.0
+
+
+DEFAULT_RULES = Rules()
+
+
+class RoundOutcome(NamedTuple):
+    """Per-round results. Vault arrays are (games, vaults), player arrays are (games, players)."""
+    success: np.ndarray
+    multiplier: np.ndarray
+    sabotages: np.ndarray
+    payout: np.ndarray
+    vault_payout: np.ndarray
+    bonus: np.ndarray
+    net_change: np.ndarray
+    cash: np.ndarray
+    bankrupt: np.ndarray
+
+
+class SimulationResult(NamedTuple):
+    wealth: np.ndarray            # (games, rounds + 1, players), column 0 is the starting cash
+    mastermind_bonus: np.ndarray  # (games,) total failure bonus wired to the Mastermind
+    bankruptcies: np.ndarray      # (games, players) number of ₹10L bailouts taken
+
+
+# ==========================================
+# 2. ROUND RESOLUTION
+# ==========================================
+def _per_vault(choice, n_vaults):
+    """Count how many players picked each vault: (games, players) -> (games, vaults)."""
+    games = choice.shape[0]
+    flat = (choice + np.arange(games)[:, None] * n_vaults)[choice != NO_VAULT]
+    return np.bincount(flat, minlength=games * n_vaults).reshape(games, n_vaults)
+
+
+def resolve(cash, roles, invest, sabotage, n_vaults, rng, rules=DEFAULT_RULES):
+    """Resolve one round for a batch of games. Inputs are (games, players); ``cash`` is not modified."""
+    cash = np.array(cash, dtype=float, copy=True)
+    invest, sabotage, roles = np.asarray(invest), np.asarray(sabotage), np.asarray(roles)
+    games = cash.shape[0]
+
+    invested = invest != NO_VAULT
+    cash -= rules.stake * invested
+    investors = _per_vault(invest, n_vaults)
+    sabotages = _per_vault(sabotage, n_vaults)
+
+    chance = np.maximum(rules.min_chance, rules.base_chance - rules.sabotage_penalty * sabotages)
+    success = rng.integers(1, 101, size=(games, n_vaults)) <= chance
+    multiplier = np.where(success, rng.choice(np.asarray(rules.multipliers), size=(games, n_vaults)), 0.0)
+    pool = rules.stake * investors
+    payout = np.divide(pool * multiplier, investors, out=np.zeros_like(multiplier), where=investors > 0)
+
+    vault_payout = np.where(invested, np.take_along_axis(payout, np.maximum(invest, 0), axis=1), 0.0)
+    bonus = np.where(roles == MASTERMIND, rules.fail_bonus * (~success).sum(axis=1, keepdims=True), 0.0)
+    cash += vault_payout + rules.salary + bonus
+    net_change = rules.salary + vault_payout + bonus - rules.stake * invested
+
+    bankrupt = cash <= 0
+    cash[bankrupt] = rules.bailout
+    return RoundOutcome(success, multiplier, sabotages, payout, vault_payout, bonus, net_change, cash, bankrupt)
+
+
+# ==========================================
+# 3. BATCHED MONTE CARLO
+# ==========================================
+def simulate(invest, sabotage, roles, cash=None, n_vaults=3, rng=None, rules=DEFAULT_RULES, chunk=1 << 15):
+    """Play whole games at once. ``invest``/``sabotage`` are (games, rounds, players) vault indices.
+
+    Games are resolved ``chunk`` at a time so the per-round temporaries stay cache-sized.
+    """
+    invest, sabotage = np.asarray(invest), np.asarray(sabotage)
+    games, rounds, players = invest.shape
+    rng = rng if rng is not None else np.random.default_rng()
+    roles = np.broadcast_to(roles, (games, players))
+    cash = np.full((games, players), rules.start_cash) if cash is None else np.broadcast_to(cash, (games, players))
+
+    wealth = np.empty((games, rounds + 1, players))
+    wealth[:, 0] = cash
+    mastermind_bonus = np.zeros(games)
+    bankruptcies = np.zeros((games, players), dtype=np.int32)
+    for lo in range(0, games, chunk):
+        g = slice(lo, lo + chunk)
+        for r in range(rounds):
+            out = resolve(wealth[g, r], roles[g], invest[g, r], sabotage[g, r], n_vaults, rng, rules)
+            wealth[g, r + 1] = out.cash
+            mastermind_bonus[g] += out.bonus.sum(axis=1)
+            bankruptcies[g] += out.bankrupt
+    return SimulationResult(wealth, mastermind_bonus, bankruptcies)
+
+
+def random_choices(games, rounds=8, players=5, n_vaults=3, rng=None, hold_rate=0.25, sabotage_rate=0.25):
+    """Uniformly random directives, handy as a baseline population for balance sweeps."""
+    rng = rng if rng is not None else np.random.default_rng()
+    shape = (games, rounds, players)
+    invest = np.where(rng.random(shape) < hold_rate, NO_VAULT, rng.integers(0, n_vaults, shape)).astype(np.int8)
+    sabotage = np.where(rng.random(shape) < sabotage_rate, rng.integers(0, n_vaults, shape), NO_VAULT).astype(np.int8)
+    return invest, sabotage
+
+
+def shuffled_roles(games, lineup=("Mastermind", "Detective", "Associate", "Associate", "Associate"), rng=None):
+    """One independent role shuffle per game, as (games, players) role codes."""
+    rng = rng if rng is not None else np.random.default_rng()
+    codes = np.array([ROLE_CODES[r] for r in lineup], dtype=np.int8)
+    return rng.permuted(np.broadcast_to(codes, (games, len(codes))), axis=1)
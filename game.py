@@ -0,0 +1,295 @@
+"""Per-table game state and the commands that mutate it.
+
+Every change to a ``GameState`` goes through ``GameState.submit``, which applies one
+command at a time under the table's lock and then publishes a fresh copy-on-write
+snapshot. Streamlit sessions run on their own threads; they read ``snapshot()``
+without locking and never see a half-applied command. When a journal is attached,
+each applied command is also appended to it so the table can be rebuilt by replay.
+"""
+import os
+import random
+import secrets
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+import engine
+from auth import new_pin
+from messages import CLUE, HOST, PLAYER, MessageStore
+from roster import ROLE_NAMES, UNSET, Roster, default_lineup, vault_label
+
+COMMANDS = {}
+SEEDED = set()  # commands that draw randomness; submit() pins a seed so the event log replays exactly
+STAMPED = set()  # commands that record a wall-clock time; submit() pins ``ts`` for the same reason
+STATE_FIELDS = ("round", "max_rounds", "game_over", "vault_names", "roles_available", "host_pin", "player_pins",
+                "roster", "messages", "bots", "history", "wealth_rows", "host_script", "auto_resolve", "round_seconds",
+                "round_deadline", "version", "game_id")
+MESSAGES = "messages.bin"  # spill file for older message pages, kept beside the table's event log
+
+
+def command(fn=None, *, seeded=False, stamped=False):
+    def register(fn):
+        COMMANDS[fn.__name__] = fn
+        if seeded: SEEDED.add(fn.__name__)
+        if stamped: STAMPED.add(fn.__name__)
+        return fn
+    return register(fn) if fn else register
+
+
+def _int_keys(d): return {int(k): v for k, v in d.items()}
+
+
+class AppendOnlyView:
+    """O(1) frozen view over the first ``n`` items of a list that is only ever appended to."""
+    __slots__ = ("_items", "_n")
+
+    def __init__(self, items):
+        self._items, self._n = items, len(items)
+
+    def __len__(self): return self._n
+
+    def __iter__(self): return (self._items[i] for i in range(self._n))
+
+    def __reversed__(self): return (self._items[i] for i in range(self._n - 1, -1, -1))
+
+    def __getitem__(self, i): return self._items[:self._n][i] if isinstance(i, slice) else self._items[range(self._n)[i]]
+
+
+# ==========================================
+# 1. GAME STATE
+# ==========================================
+class GameState:
+    def __init__(self, journal=None, n_players=5, n_vaults=3, max_rounds=8):
+        self.round = 1
+        self.max_rounds = max_rounds
+        self.game_over = False
+        self.vault_names = [vault_label(i) for i in range(n_vaults)]
+        self.roles_available = default_lineup(n_players)
+        self.host_pin = new_pin()
+        self.player_pins = {pid: new_pin() for pid in range(1, n_players + 1)}
+        self.rules = engine.DEFAULT_RULES
+        self.roster = Roster(n_players, self.rules.start_cash)
+        self.messages = MessageStore(n_players, os.path.join(journal.path, MESSAGES) if journal else None)
+        self.bots = {}  # pid -> strategy name (see bots.STRATEGIES) for seats played by the server
+        self.history = []  # one record per resolved round, round r at index r - 1 (see round_record)
+        self.wealth_rows = [[0, pid, cash] for pid, cash in zip(self.roster.pids, self.roster.cash.tolist())]  # long format: [round, pid, wealth]
+        self.host_script = "Welcome, Initiates. I am the Supreme Orchestrator. The High Council controls the board; you are just playing on it. Survive our gauntlet. Round 1 begins."
+        self.auto_resolve = False   # resolve as soon as every seat is locked in (see scheduler)
+        self.round_seconds = 0      # host-set round length; 0 means no deadline
+        self.round_deadline = None  # wall-clock time the current round closes, if timed
+        self.version = 0
+        self.game_id = secrets.token_hex(8)
+        self.journal = journal
+        self.listeners = []  # fn(game, cmd) called after each applied command, outside the lock
+        self._lock = threading.Lock()
+        self._snapshot = self._take_snapshot()
+
+    def submit(self, cmd, /, **args):
+        """Apply one command atomically and return its result. Commands return False when nothing changed."""
+        if cmd in SEEDED: args.setdefault("seed", secrets.randbits(63))
+        if cmd in STAMPED: args.setdefault("ts", round(time.time(), 3))
+        with self._lock:
+            result = self._apply(cmd, args)
+            if result is not False and self.journal is not None: self.journal.append(self, cmd, args)
+        if result is not False:
+            for fn in self.listeners: fn(self, cmd)
+        return result
+
+    def _apply(self, cmd, args):
+        result = COMMANDS[cmd](self, **args)
+        if result is not False:
+            self.version += 1
+            self._snapshot = self._take_snapshot()
+        return result
+
+    def to_dict(self):
+        return {f: (self.roster.to_dict() if f == "roster" else self.messages.to_dict() if f == "messages" else getattr(self, f)) for f in STATE_FIELDS}
+
+    @classmethod
+    def restore(cls, data=None, events=(), path=None):
+        """Rebuild a table from a ``to_dict()`` snapshot (JSON round-tripped) plus the events logged after it.
+
+        ``path`` is the table's journal directory, where its spilled message pages live.
+        """
+        game = cls()
+        spill = os.path.join(path, MESSAGES) if path else None
+        if data:
+            for f in STATE_FIELDS:
+                if f in data: setattr(game, f, data[f])  # fields newer than the snapshot keep their defaults, as Roster columns do
+            game.player_pins, game.bots, game.roster = _int_keys(game.player_pins), _int_keys(game.bots), Roster.from_dict(data["roster"])
+            game.messages = MessageStore.from_dict(data["messages"], spill) if "messages" in data else MessageStore(len(game.roster), spill)
+        elif spill:
+            game.messages = MessageStore(len(game.roster), spill)
+            if os.path.exists(spill): os.truncate(spill, 0)
+        for e in events: game._apply(e["cmd"], e["args"])
+        game._snapshot = game._take_snapshot()
+        return game
+
+    def snapshot(self):
+        """The latest consistent, read-only view of the table. Never blocks."""
+        return self._snapshot
+
+    def _take_snapshot(self):
+        # Roster columns are copied (one memcpy each); messages and histories are append-only,
+        # so count-pinned views stand in for copies.
+        return SimpleNamespace(
+            version=self.version, round=self.round, max_rounds=self.max_rounds, game_over=self.game_over,
+            vault_names=list(self.vault_names), host_pin=self.host_pin, player_pins=dict(self.player_pins), bots=dict(self.bots),
+            roster=self.roster.frozen(), messages=self.messages.view(), history=AppendOnlyView(self.history),
+            wealth_rows=AppendOnlyView(self.wealth_rows), host_script=self.host_script,
+            auto_resolve=self.auto_resolve, round_seconds=self.round_seconds, round_deadline=self.round_deadline, game_id=self.game_id)
+
+
+# ==========================================
+# 2. PLAYER & HOST COMMANDS
+# ==========================================
+def vault_index(game, choice):
+    """Directive label -> engine vault index. Anything that is not a vault ("Hold Cash", "None") is NO_VAULT."""
+    return game.vault_names.index(choice) if choice in game.vault_names else engine.NO_VAULT
+
+
+def choice_label(game, index, hold="Hold Cash"):
+    return game.vault_names[index] if index >= 0 else hold
+
+
+def round_record(history, round_no):
+    """History record for a resolved round. Rounds resolve in order from 1, so this is a direct index, not a scan."""
+    return history[round_no - 1]
+
+
+@command(seeded=True)
+def shuffle_roles(game, seed=None):
+    roles = game.roles_available.copy()
+    random.Random(seed).shuffle(roles)
+    game.roster.role[:] = [engine.ROLE_CODES[r] for r in roles]
+
+
+@command
+def rename(game, pid, name):
+    game.roster.names[pid - 1] = name
+
+
+@command
+def set_pin(game, pid, pin):
+    game.player_pins[pid] = pin
+
+
+@command
+def set_host_pin(game, pin):
+    game.host_pin = pin
+
+
+@command(stamped=True)
+def set_round_clock(game, auto_resolve, seconds, ts=None):
+    """Host's round clock: auto-resolve once everyone is in, and/or close each round ``seconds`` after it opens.
+
+    Only a change of ``seconds`` moves the deadline, so toggling auto-resolve mid-round never restarts
+    the clock. A new length set mid-round runs in full from now: measuring it from when the round
+    opened could put the deadline in the past and close the round the moment the host touched it.
+    """
+    if (game.auto_resolve, game.round_seconds) == (auto_resolve, seconds): return False
+    game.auto_resolve = auto_resolve
+    if seconds == game.round_seconds: return
+    game.round_seconds = seconds
+    game.round_deadline = ts + seconds if seconds and not game.game_over else None
+
+
+@command
+def set_bot(game, pid, strategy=None):
+    """Hand a seat to a server-side bot, or back to a human with ``strategy=None``."""
+    if game.bots.get(pid) == strategy: return False
+    if strategy is None: del game.bots[pid]
+    else: game.bots[pid] = strategy
+
+
+@command
+def lock_in(game, pid, invest, sabotage):
+    """Record a player's directives for the current round; ignored once they are locked."""
+    i, r = pid - 1, game.roster
+    if game.game_over or r.ready()[i]: return False
+    r.invest[i], r.sabotage[i] = vault_index(game, invest), vault_index(game, sabotage)
+    return True
+
+
+def _deliver(game, kind, sender, target, text, ts, data=None):
+    game.messages.append(kind, sender, target, game.round, text, ts, data)
+    game.roster.unread[target - 1] += 1
+
+
+@command(stamped=True)
+def host_message(game, target, text, ts=None):
+    _deliver(game, HOST, 0, target, text, ts)
+
+
+@command(stamped=True)
+def send_message(game, sender, target, text, ts=None):
+    """Charge the sender and deliver the message, or return False if they cannot afford it."""
+    r = game.roster
+    if r.cash[sender - 1] < game.rules.message_cost: return False
+    r.cash[sender - 1] -= game.rules.message_cost
+    r.message_spend[sender - 1] += game.rules.message_cost
+    _deliver(game, PLAYER, sender, target, text, ts)
+    return True
+
+
+@command
+def read_inbox(game, pid):
+    if not game.roster.unread[pid - 1]: return False
+    game.roster.unread[pid - 1] = 0
+
+
+@command
+def ack_bankruptcy(game, pid):
+    if not game.roster.bankrupt_warning[pid - 1]: return False
+    game.roster.bankrupt_warning[pid - 1] = False
+
+
+# ==========================================
+# 3. ROUND RESOLUTION
+# ==========================================
+@command(seeded=True, stamped=True)
+def resolve_round(game, expected_round=None, seed=None, ts=None):
+    """Resolve the current round through the shared engine. Players who never locked in hold cash and sabotage nothing.
+
+    ``expected_round`` makes the command idempotent: a second click (or a second host tab)
+    aimed at an already-resolved round is a no-op and returns False.
+    """
+    if game.game_over or (expected_round is not None and expected_round != game.round): return False
+    r, n_vaults = game.roster, len(game.vault_names)
+    invest = np.where(r.invest == UNSET, engine.NO_VAULT, r.invest)
+    sabotage = np.where(r.sabotage == UNSET, engine.NO_VAULT, r.sabotage)
+    out = engine.resolve(r.cash[None], r.role[None], invest[None], sabotage[None], n_vaults, np.random.default_rng(seed), game.rules)
+    total_sabotages = int(out.sabotages.sum())
+
+    round_results = {}
+    for v, v_name in enumerate(game.vault_names):
+        if out.success[0, v]: round_results[v_name] = {"status": "SUCCESS", "multiplier": float(out.multiplier[0, v]), "sabs": int(out.sabotages[0, v]), "payout": float(out.payout[0, v])}
+        else: round_results[v_name] = {"status": "FAILED", "multiplier": 0, "sabs": int(out.sabotages[0, v]), "payout": 0}
+
+    # Per-player results are stored column-wise, indexed by pid - 1.
+    player_snapshot = {
+        "name": list(r.names), "role": [ROLE_NAMES[c] for c in r.role.tolist()],
+        "invest_choice": [choice_label(game, v) for v in invest.tolist()], "sabotage_choice": [choice_label(game, v, "None") for v in sabotage.tolist()],
+        "vault_payout": out.vault_payout[0].tolist(), "bonus_income": out.bonus[0].tolist(), "net_change": out.net_change[0].tolist(), "bailout": out.bankrupt[0].tolist()}
+
+    r.total_sabotages += sabotage != engine.NO_VAULT
+    for i in np.flatnonzero(r.role == engine.DETECTIVE):
+        _deliver(game, CLUE, 0, int(i) + 1, f"There were exactly {total_sabotages} sabotages total in Round {game.round}.", ts, total_sabotages)
+    r.cash[:] = out.cash[0]
+    r.bankrupt_warning |= out.bankrupt[0]
+    game.wealth_rows.extend([game.round, pid, cash] for pid, cash in zip(r.pids, r.cash.tolist()))
+    r.invest[:] = UNSET
+    r.sabotage[:] = UNSET
+
+    game.history.append({"round": game.round, "results": round_results, "players": player_snapshot})
+    succeeded = int(out.success.sum())
+    if succeeded == n_vaults: game.host_script = f"Round {game.round-1} conclusion: Flawless execution. All {n_vaults} vaults cracked."
+    elif succeeded == 0: game.host_script = f"Round {game.round-1} conclusion: A bloodbath. All vaults compromised. Total loss."
+    else: game.host_script = f"Round {game.round-1} conclusion: Mixed outcomes. Trust is fracturing."
+
+    if game.round >= game.max_rounds: game.game_over = True
+    else: game.round += 1
+    game.round_deadline = ts + game.round_seconds if game.round_seconds and not game.game_over else None
+    return True
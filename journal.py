@@ -0,0 +1,129 @@
+"""Append-only, on-disk event log for crash recovery of live tables.
+
+Layout under the data root::
+
+    live/<code>/events.jsonl     one applied command per line, flushed on every write
+    live/<code>/snapshot.json    latest compact state plus the log offset it covers
+    live/<code>/messages.bin     older message pages spilled out of memory (see ``messages``)
+    archive/<code>-<stamp>/      tables that were closed, evicted or hard-reset
+
+A restart rebuilds each live table from its snapshot and replays only the log tail past
+the snapshot's byte offset, so recovery cost is bounded by ``snapshot_every`` events per
+table and archived games are never read.
+"""
+import json
+import logging
+import os
+import shutil
+import time
+
+from game import GameState
+
+log = logging.getLogger(__name__)
+
+EVENTS, SNAPSHOT = "events.jsonl", "snapshot.json"
+
+
+class EventLog:
+    def __init__(self, path, snapshot_every=50):
+        self.path, self.snapshot_every = path, snapshot_every
+        os.makedirs(path, exist_ok=True)
+        self._file = open(os.path.join(path, EVENTS), "ab")
+        self._since_snapshot = 0
+        self._final = False  # a snapshot of the finished game has been written
+
+    def append(self, game, cmd, args):
+        """Record one applied command. Called by ``GameState.submit`` while it holds the table lock."""
+        line = json.dumps({"v": game.version, "t": round(time.time(), 3), "cmd": cmd, "args": args}, separators=(",", ":"))
+        self._file.write(line.encode() + b"\n")
+        self._file.flush()
+        self._since_snapshot += 1
+        if self._since_snapshot >= self.snapshot_every or (game.game_over and not self._final): self.write_snapshot(game)
+
+    def write_snapshot(self, game):
+        tmp = os.path.join(self.path, SNAPSHOT + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"offset": self._file.tell(), "state": game.to_dict()}, f, separators=(",", ":"))
+        os.replace(tmp, os.path.join(self.path, SNAPSHOT))
+        self._since_snapshot = 0
+        self._final = game.game_over
+
+    def close(self): self._file.close()
+
+
+def read_log(path):
+    """Return (snapshot state or None, events after it). A torn final line from a crash is cut off."""
+    snapshot, offset = None, 0
+    snap_path = os.path.join(path, SNAPSHOT)
+    if os.path.exists(snap_path):
+        with open(snap_path, encoding="utf-8") as f: data = json.load(f)
+        snapshot, offset = data["state"], data["offset"]
+
+    events, good_end = [], offset
+    log_path = os.path.join(path, EVENTS)
+    with open(log_path, "rb") as f:
+        f.seek(offset)
+        for line in f:
+            if not line.endswith(b"\n"): break
+            try: events.append(json.loads(line))
+            except ValueError: break
+            good_end += len(line)
+    if os.path.getsize(log_path) > good_end:
+        with open(log_path, "r+b") as f: f.truncate(good_end)
+    return snapshot, events
+
+
+class Journal:
+    """Opens, recovers and archives the event logs of every table under one data root."""
+
+    def __init__(self, root, snapshot_every=50):
+        self.root, self.snapshot_every = root, snapshot_every
+        self.live, self.archive_dir = os.path.join(root, "live"), os.path.join(root, "archive")
+        os.makedirs(self.live, exist_ok=True)
+        os.makedirs(self.archive_dir, exist_ok=True)
+        self.last_recovery = None  # (tables, events replayed, seconds, codes that failed to recover)
+
+    def open(self, code, **options):
+        """Start a fresh, journaled table for ``code``; ``options`` size the table (see ``GameState``)."""
+        path = os.path.join(self.live, code)
+        if os.path.exists(path): self._archive_path(code, path)
+        log = EventLog(path, self.snapshot_every)
+        game = GameState(journal=log, **options)
+        log.write_snapshot(game)
+        return game
+
+    def close(self, code, game):
+        """Detach a table's log and move it to the archive."""
+        if game.journal is not None:
+            game.journal.close()
+            game.journal = None
+        game.messages.close()
+        path = os.path.join(self.live, code)
+        if os.path.exists(path): self._archive_path(code, path)
+
+    def _archive_path(self, code, path):
+        shutil.move(path, os.path.join(self.archive_dir, f"{code}-{time.strftime('%Y%m%d-%H%M%S')}-{time.monotonic_ns() % 10**6:06d}"))
+
+    def recover(self, code):
+        path = os.path.join(self.live, code)
+        snapshot, events = read_log(path)
+        game = GameState.restore(snapshot, events, path)
+        game.journal = EventLog(path, self.snapshot_every)
+        if events: game.journal.write_snapshot(game)
+        return game, len(events)
+
+    def recover_all(self):
+        """Rebuild every live table. Returns {code: game} and records timing in ``last_recovery``.
+
+        A table that fails to load is logged, listed in ``last_recovery`` and left on disk for inspection.
+        """
+        t0, games, replayed, failed = time.perf_counter(), {}, 0, []
+        for code in sorted(os.listdir(self.live)):
+            try: games[code], n = self.recover(code)
+            except Exception:
+                log.exception("journal: table %s could not be recovered", code)
+                failed.append(code)
+                continue
+            replayed += n
+        self.last_recovery = (len(games), replayed, time.perf_counter() - t0, failed)
+        return games
@@ -0,0 +1,160 @@
+"""In-process registry of concurrent game tables, keyed by a short join code.
+
+Each lobby owns its own game object, so resets and evictions never touch other tables.
+Idle lobbies expire after ``ttl`` seconds (``finished_ttl`` once the game is over) and
+the least recently used lobby is dropped whenever ``max_lobbies`` is exceeded.
+``factory(code, **options)`` builds a table's game and ``on_close(code, game)`` is told whenever
+one leaves the registry (evicted, closed or replaced by a reset).
+"""
+import secrets
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+CODE_ALPHABET = "ABCDEFGHJKLMNPQRSTUVWXYZ23456789"
+
+
+def deep_sizeof(obj, seen=None):
+    """Rough recursive memory footprint of an object graph, in bytes."""
+    seen = set() if seen is None else seen
+    if id(obj) in seen: return 0
+    seen.add(id(obj))
+    if isinstance(obj, np.ndarray): return sys.getsizeof(obj) + (obj.nbytes if obj.base is not None else 0)  # views do not count their buffer
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict): size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)): size += sum(deep_sizeof(i, seen) for i in obj)
+    else:
+        if hasattr(obj, "__dict__"): size += deep_sizeof(vars(obj), seen)
+        for slot in {s for cls in type(obj).__mro__ for s in getattr(cls, "__slots__", ())}:
+            if hasattr(obj, slot): size += deep_sizeof(getattr(obj, slot), seen)
+    return size
+
+
+class Lobby:
+    __slots__ = ("code", "game", "created", "last_seen")
+
+    def __init__(self, code, game):
+        self.code, self.game = code, game
+        self.created = self.last_seen = time.monotonic()
+
+
+class LobbyRegistry:
+    def __init__(self, factory, ttl=2 * 3600, finished_ttl=15 * 60, max_lobbies=500, code_length=5, sweep_every=30, on_close=None, stats_every=30):
+        self.factory, self.on_close = factory, on_close
+        self.ttl, self.finished_ttl = ttl, finished_ttl
+        self.max_lobbies, self.code_length, self.sweep_every, self.stats_every = max_lobbies, code_length, sweep_every, stats_every
+        self._lobbies = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+        self._stats = (None, [])  # (monotonic time taken, rows)
+        self._sizes = {}          # code -> (monotonic time taken, bytes), for table_bytes
+
+    def __len__(self): return len(self._lobbies)
+
+    def __contains__(self, code): return code in self._lobbies
+
+    def _new_code(self):
+        while True:
+            code = "".join(secrets.choice(CODE_ALPHABET) for _ in range(self.code_length))
+            if code not in self._lobbies: return code
+
+    def _expired(self, lobby, now):
+        ttl = self.finished_ttl if getattr(lobby.game, "game_over", False) else self.ttl
+        return now - lobby.last_seen > ttl
+
+    def _evict(self, now, force=False):
+        """Drop expired and over-cap lobbies; returns them so callers can notify outside the lock."""
+        dropped = []
+        if force or now - self._last_sweep >= self.sweep_every:
+            self._last_sweep = now
+            for code in [c for c, lobby in self._lobbies.items() if self._expired(lobby, now)]: dropped.append(self._lobbies.pop(code))
+        while len(self._lobbies) > self.max_lobbies: dropped.append(self._lobbies.popitem(last=False)[1])
+        return dropped
+
+    def _closed(self, lobbies):
+        if self.on_close is not None:
+            for lobby in lobbies: self.on_close(lobby.code, lobby.game)
+
+    def create(self, **options):
+        """Open a new table and return its join code. ``options`` are passed through to the factory."""
+        with self._lock:
+            now = time.monotonic()
+            code = self._new_code()
+            self._lobbies[code] = Lobby(code, self.factory(code, **options))
+            dropped = self._evict(now)
+        self._closed(dropped)
+        return code
+
+    def adopt(self, code, game):
+        """Register an existing game (e.g. one recovered from disk) under its original join code."""
+        with self._lock:
+            self._lobbies[code] = Lobby(code, game)
+            dropped = self._evict(time.monotonic())
+        self._closed(dropped)
+
+    def get(self, code):
+        """Return the game for ``code`` (marking it as recently used), or None if unknown/evicted."""
+        code = (code or "").strip().upper()
+        with self._lock:
+            now = time.monotonic()
+            dropped = self._evict(now)
+            lobby = self._lobbies.get(code)
+            if lobby is not None:
+                lobby.last_seen = now
+                self._lobbies.move_to_end(code)
+        self._closed(dropped)
+        return lobby.game if lobby is not None else None
+
+    def reset(self, code, **options):
+        """Replace a single table's game with a fresh one, keeping its join code."""
+        with self._lock:
+            old = self._lobbies.get(code)
+            if old is None: return None
+        self._closed([old])
+        with self._lock:
+            lobby = self._lobbies[code] = Lobby(code, self.factory(code, **options))
+        return lobby.game
+
+    def close(self, code):
+        with self._lock: lobby = self._lobbies.pop(code, None)
+        if lobby is not None: self._closed([lobby])
+        return lobby is not None
+
+    def sweep(self):
+        """Force an eviction pass; returns the number of live lobbies afterwards."""
+        with self._lock:
+            dropped = self._evict(time.monotonic(), force=True)
+            live = len(self._lobbies)
+        self._closed(dropped)
+        return live
+
+    def stats(self):
+        """Per-lobby summary rows: join code, round, finished flag, idle seconds and approximate bytes.
+
+        Sizing walks every table's object graph, so rows are reused for ``stats_every`` seconds.
+        """
+        taken, rows = self._stats
+        now = time.monotonic()
+        if taken is not None and now - taken < self.stats_every: return rows
+        with self._lock: lobbies = list(self._lobbies.values())
+        rows = [{"code": l.code, "round": getattr(l.game, "round", None), "finished": getattr(l.game, "game_over", False),
+                 "idle_s": round(now - l.last_seen, 1), "bytes": deep_sizeof(l.game)} for l in lobbies]
+        self._stats = (now, rows)
+        return rows
+
+    def table_bytes(self, code):
+        """Approximate bytes held by one table, re-measured at most every ``stats_every`` seconds; None if the code is unknown."""
+        with self._lock: lobby = self._lobbies.get(code)
+        if lobby is None:
+            self._sizes.pop(code, None)
+            return None
+        now = time.monotonic()
+        taken, size = self._sizes.get(code, (None, 0))
+        if taken is None or now - taken >= self.stats_every:
+            size = deep_sizeof(lobby.game)
+            self._sizes = {c: s for c, s in self._sizes.items() if c in self._lobbies}  # forget closed tables
+            self._sizes[code] = (now, size)
+        return size
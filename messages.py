@@ -0,0 +1,135 @@
+"""Per-table message store: structured records, per-recipient indexes and cursor pagination.
+
+Each recipient's messages are numbered 0..count-1. Only the newest ``window`` to
+``window + page_size`` of them stay in memory; older ones are spilled to disk a page at
+a time and read back with ``os.pread`` when someone pages that far. Spilled pages are
+batched in a small write buffer so the table lock is rarely held across a syscall. The store is
+append-only, so a ``MessageView`` pinned to the counts at snapshot time stays consistent
+while new messages keep arriving.
+"""
+import json
+import os
+import tempfile
+from typing import NamedTuple
+
+HOST, PLAYER, CLUE = "host", "player", "clue"
+KINDS = (HOST, PLAYER, CLUE)
+
+
+class Message(NamedTuple):
+    seq: int
+    ts: float
+    round: int
+    kind: str
+    sender: int  # pid, or 0 for the Orchestrator / system
+    recipient: int
+    text: str
+    data: object = None  # machine-readable payload, e.g. a clue's sabotage count, so code never parses ``text``
+
+
+def render_message(msg, names):
+    if msg.kind == HOST: return f"👑 FROM ORCHESTRATOR: {msg.text}"
+    if msg.kind == CLUE: return f"🕵️‍♂️ SYSTEM CLUE: {msg.text}"
+    return f"📩 From {names[msg.sender - 1]}: {msg.text}"
+
+
+class MessageStore:
+    def __init__(self, n_players, path=None, window=40, page_size=20, flush_bytes=1 << 16):
+        self.path, self.window, self.page_size, self.flush_bytes = path, window, page_size, flush_bytes
+        self.seq = 0
+        self.counts = [0] * n_players
+        self.kind_counts = dict.fromkeys(KINDS, 0)
+        self._mem = [(0, []) for _ in range(n_players)]  # (position of first in-memory message, messages)
+        self._pages = [[] for _ in range(n_players)]     # (offset, length) of each spilled page, oldest first
+        self._file = None
+        self._buf = (0, b"")  # (bytes already on disk, spilled pages not yet written), swapped as a pair
+
+    def append(self, kind, sender, recipient, round_no, text, ts, data=None):
+        i = recipient - 1
+        msg = Message(self.seq, ts, round_no, kind, sender, recipient, text, data)
+        self.seq += 1
+        self._mem[i][1].append(msg)
+        self.counts[i] += 1
+        self.kind_counts[kind] += 1
+        if len(self._mem[i][1]) >= self.window + self.page_size: self._spill(i)
+        return msg
+
+    def _spill_fd(self):
+        if self._file is None:
+            self._file = open(self.path, "a+b") if self.path else tempfile.TemporaryFile()
+        return self._file.fileno()
+
+    def _spill(self, i):
+        base, mem = self._mem[i]
+        data = json.dumps([list(m) for m in mem[:self.page_size]], separators=(",", ":")).encode() + b"\n"
+        size, pending = self._buf
+        self._pages[i].append((size + len(pending), len(data)))
+        self._buf = (size, pending + data)
+        self._mem[i] = (base + self.page_size, mem[self.page_size:])  # swapped whole so readers never see a torn pair
+        if len(pending) + len(data) >= self.flush_bytes: self.flush()
+
+    def flush(self):
+        size, pending = self._buf
+        if pending:
+            fd = self._spill_fd()
+            os.lseek(fd, 0, os.SEEK_END)
+            os.write(fd, pending)
+            self._buf = (size + len(pending), b"")
+
+    def _read_page(self, i, k):
+        offset, length = self._pages[i][k]
+        size, pending = self._buf
+        data = pending[offset - size:offset - size + length] if offset >= size else os.pread(self._spill_fd(), length, offset)
+        return [Message(*m) for m in json.loads(data)]
+
+    def read(self, recipient, start, stop):
+        """Messages at positions [start, stop) for one recipient, oldest first."""
+        i, p = recipient - 1, self.page_size
+        base, mem = self._mem[i]
+        out = []
+        for k in range(start // p, (min(stop, base) + p - 1) // p):
+            out.extend(self._read_page(i, k)[max(start - k * p, 0):stop - k * p])
+        return out + mem[max(start - base, 0):max(stop - base, 0)]
+
+    def view(self):
+        return MessageView(self, list(self.counts), dict(self.kind_counts))
+
+    def close(self):
+        self.flush()
+        if self._file is not None: self._file.close()
+
+    def to_dict(self):
+        self.flush()
+        spill_size = self._buf[0]
+        return {"seq": self.seq, "counts": self.counts, "kind_counts": self.kind_counts, "window": self.window, "page_size": self.page_size,
+                "mem": [[base, [list(m) for m in mem]] for base, mem in self._mem], "pages": self._pages, "spill_size": spill_size}
+
+    @classmethod
+    def from_dict(cls, data, path=None):
+        """Restore from ``to_dict()``; pages spilled after that snapshot are cut from the spill file so replay re-spills them."""
+        store = cls(len(data["counts"]), path, data["window"], data["page_size"])
+        store.seq, store.counts, store.kind_counts = data["seq"], list(data["counts"]), dict(data["kind_counts"])
+        store._mem = [(base, [Message(*m) for m in mem]) for base, mem in data["mem"]]
+        store._pages = [[tuple(p) for p in pages] for pages in data["pages"]]
+        store._buf = (data["spill_size"], b"")
+        if path and os.path.exists(path) and os.path.getsize(path) > data["spill_size"]: os.truncate(path, data["spill_size"])
+        return store
+
+
+class MessageView:
+    """A store pinned to the message counts at snapshot time."""
+    __slots__ = ("_store", "counts", "kind_counts")
+
+    def __init__(self, store, counts, kind_counts):
+        self._store, self.counts, self.kind_counts = store, counts, kind_counts
+
+    def count(self, recipient): return self.counts[recipient - 1]
+
+    def page(self, recipient, before=None, limit=10):
+        """Newest-first page ending just before position ``before`` (None = newest).
+
+        Returns (messages, cursor) where cursor fetches the next older page, or None at the start.
+        """
+        stop = self.counts[recipient - 1] if before is None else min(before, self.counts[recipient - 1])
+        start = max(0, stop - limit)
+        return self._store.read(recipient, start, stop)[::-1], (start if start > 0 else None)
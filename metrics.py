@@ -0,0 +1,117 @@
+"""Lightweight hot-path timing for the app, with a periodic Prometheus-text or JSON-lines export.
+
+    with metrics.timer("render_wealth_chart"): ...
+
+Each named section keeps a count, a running total, its max and a bounded window of recent
+durations for percentiles. Reruns are counted per table and sessions are tracked by a
+heartbeat, so the host panel and the export can show active sessions. When disabled,
+``timer`` hands back one shared no-op context manager and every other hook returns at once,
+so instrumented code pays a single attribute check.
+"""
+import contextlib
+import json
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+_NOOP = contextlib.nullcontext()
+
+
+class Section:
+    __slots__ = ("count", "total", "max", "recent")
+
+    def __init__(self, window):
+        self.count, self.total, self.max, self.recent = 0, 0.0, 0.0, deque(maxlen=window)
+
+
+class _Timer:
+    __slots__ = ("_metrics", "_name", "_t0")
+
+    def __init__(self, metrics, name): self._metrics, self._name = metrics, name
+
+    def __enter__(self): self._t0 = time.perf_counter()
+
+    def __exit__(self, *exc): self._metrics.observe(self._name, time.perf_counter() - self._t0)
+
+
+class Metrics:
+    def __init__(self, enabled=False, path=None, every=30.0, stats=None, window=512, session_ttl=60.0):
+        """``path`` ending in ``.jsonl`` appends a JSON line per export; anything else is rewritten as Prometheus text.
+
+        ``stats`` is an optional callable returning per-table rows (see ``LobbyRegistry.stats``) for state-size gauges.
+        """
+        self.enabled, self.path, self.every, self.stats = enabled, path, every, stats
+        self.window, self.session_ttl = window, session_ttl
+        self._sections, self._reruns, self._sessions = {}, {}, {}
+        self._lock = threading.Lock()
+        if enabled and path:
+            self._stop = threading.Event()
+            threading.Thread(target=self._export_loop, name="metrics-export", daemon=True).start()
+
+    def timer(self, name):
+        return _Timer(self, name) if self.enabled else _NOOP
+
+    def observe(self, name, secs):
+        with self._lock:
+            s = self._sections.get(name)
+            if s is None: s = self._sections[name] = Section(self.window)
+            s.count += 1
+            s.total += secs
+            s.max = max(s.max, secs)
+            s.recent.append(secs)
+
+    def rerun(self, code, session_id):
+        """Count one script run for a table and refresh the session's heartbeat."""
+        if not self.enabled: return
+        with self._lock:
+            self._reruns[code] = self._reruns.get(code, 0) + 1
+            self._sessions[session_id] = time.monotonic()
+
+    def active_sessions(self):
+        cutoff = time.monotonic() - self.session_ttl
+        with self._lock:
+            for sid in [sid for sid, seen in self._sessions.items() if seen < cutoff]: del self._sessions[sid]
+            return len(self._sessions)
+
+    def snapshot(self, with_tables=False):
+        with self._lock:
+            sections = {name: (s.count, s.total, s.max, list(s.recent)) for name, s in self._sections.items()}
+            reruns = dict(self._reruns)
+        out = {"t": round(time.time(), 3), "active_sessions": self.active_sessions(), "reruns": reruns, "sections": {}}
+        for name, (count, total, peak, recent) in sorted(sections.items()):
+            p50, p95, p99 = np.percentile(recent, [50, 95, 99]).tolist()
+            out["sections"][name] = {"count": count, "total_s": total, "max_s": peak, "p50_s": p50, "p95_s": p95, "p99_s": p99}
+        if with_tables and self.stats is not None: out["table_bytes"] = {row["code"]: row["bytes"] for row in self.stats()}
+        return out
+
+    def to_prometheus(self, snap):
+        lines = ["# TYPE syndicate_section_seconds summary"]
+        for name, s in snap["sections"].items():
+            for q, key in (("0.5", "p50_s"), ("0.95", "p95_s"), ("0.99", "p99_s")): lines.append(f'syndicate_section_seconds{{section="{name}",quantile="{q}"}} {s[key]:.6f}')
+            lines.append(f'syndicate_section_seconds_sum{{section="{name}"}} {s["total_s"]:.6f}')
+            lines.append(f'syndicate_section_seconds_count{{section="{name}"}} {s["count"]}')
+        lines += ["# TYPE syndicate_reruns_total counter"] + [f'syndicate_reruns_total{{table="{code}"}} {n}' for code, n in sorted(snap["reruns"].items())]
+        lines += ["# TYPE syndicate_active_sessions gauge", f"syndicate_active_sessions {snap['active_sessions']}"]
+        if "table_bytes" in snap:
+            lines += ["# TYPE syndicate_table_bytes gauge"] + [f'syndicate_table_bytes{{table="{code}"}} {b}' for code, b in sorted(snap["table_bytes"].items())]
+        return "\n".join(lines) + "\n"
+
+    def export(self):
+        snap = self.snapshot(with_tables=True)
+        if self.path.endswith(".jsonl"):
+            with open(self.path, "a", encoding="utf-8") as f: f.write(json.dumps(snap, separators=(",", ":")) + "\n")
+            return
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f: f.write(self.to_prometheus(snap))
+        os.replace(tmp, self.path)
+
+    def _export_loop(self):
+        while not self._stop.wait(self.every):
+            try: self.export()
+            except OSError: pass  # a full or missing disk must not take the app down; the next period retries
+
+    def close(self):
+        if self.enabled and self.path: self._stop.set()
@@ -0,0 +1,70 @@
+"""Struct-of-arrays player table for tables of any size.
+
+One NumPy column per per-player field, indexed by ``pid - 1``. Vault directives are stored
+as engine vault indices: ``engine.NO_VAULT`` is an explicit "Hold Cash" / "None" and
+``UNSET`` means the player has not locked in yet this round.
+"""
+import numpy as np
+
+import engine
+
+UNSET = -2
+ROLE_NAMES = {code: name for name, code in engine.ROLE_CODES.items()}
+
+
+def vault_label(i):
+    return f"Vault {chr(ord('A') + i)}" if i < 26 else f"Vault {i + 1}"
+
+
+def default_lineup(n_players):
+    """One Mastermind, one Detective, everyone else an Associate."""
+    return ["Mastermind", "Detective"] + ["Associate"] * (n_players - 2)
+
+
+class Roster:
+    __slots__ = ("names", "role", "cash", "invest", "sabotage", "total_sabotages", "message_spend", "unread", "bankrupt_warning")
+    ARRAYS = ("role", "cash", "invest", "sabotage", "total_sabotages", "message_spend", "unread", "bankrupt_warning")
+
+    def __init__(self, n_players, start_cash=engine.DEFAULT_RULES.start_cash):
+        self.names = [f"Player {pid}" for pid in range(1, n_players + 1)]
+        self.role = np.full(n_players, engine.ASSOCIATE, dtype=np.int8)
+        self.cash = np.full(n_players, start_cash, dtype=np.float64)
+        self.invest = np.full(n_players, UNSET, dtype=np.int16)
+        self.sabotage = np.full(n_players, UNSET, dtype=np.int16)
+        self.total_sabotages = np.zeros(n_players, dtype=np.int32)
+        self.message_spend = np.zeros(n_players, dtype=np.float64)
+        self.unread = np.zeros(n_players, dtype=np.int32)
+        self.bankrupt_warning = np.zeros(n_players, dtype=bool)
+
+    def __len__(self): return len(self.names)
+
+    @property
+    def pids(self): return range(1, len(self.names) + 1)
+
+    def ready(self):
+        """Boolean mask of players who have locked in both directives."""
+        return (self.invest != UNSET) & (self.sabotage != UNSET)
+
+    def role_name(self, pid): return ROLE_NAMES[int(self.role[pid - 1])]
+
+    def ranking(self):
+        """Player indices ordered richest first, fewer sabotages breaking ties."""
+        return np.lexsort((self.total_sabotages, -self.cash))
+
+    def frozen(self):
+        """Copy for read-only snapshots."""
+        copy = Roster.__new__(Roster)
+        copy.names = list(self.names)
+        for f in self.ARRAYS: setattr(copy, f, getattr(self, f).copy())
+        return copy
+
+    def to_dict(self):
+        return {"names": self.names, **{f: getattr(self, f).tolist() for f in self.ARRAYS}}
+
+    @classmethod
+    def from_dict(cls, data):
+        roster = cls.__new__(cls)
+        roster.names = list(data["names"])
+        fresh = cls(0)
+        for f in cls.ARRAYS: setattr(roster, f, np.array(data.get(f, [0] * len(roster.names)), dtype=getattr(fresh, f).dtype))  # older snapshots lack newer columns
+        return roster
@@ -0,0 +1,106 @@
+"""One background thread that closes rounds for every live table.
+
+Tables are ``watch``-ed when they open. Every applied command pokes the scheduler through
+``GameState.listeners``; the thread then lets bot seats act and, on tables with
+``auto_resolve``, resolves the round the moment every seat is locked in. Timed rounds sit
+on a hashed timer wheel (``slots`` buckets of ``tick`` seconds, keyed by the round's
+wall-clock deadline), so a pass over the wheel costs O(due entries) however many tables
+are open. At the deadline, seats that never locked in hold cash and sabotage nothing
+(``resolve_round``'s default). Every resolution is submitted with ``expected_round``, so
+a host click racing the scheduler resolves the round exactly once. Clients pick the new
+round up through their auto-refreshing fragments. ``timer`` (a ``Metrics.timer``) times each
+resolution under the same "resolve_round" section as the host's button.
+"""
+import contextlib
+import logging
+import queue
+import random
+import threading
+import time
+
+import bots
+
+log = logging.getLogger(__name__)
+
+
+class RoundScheduler:
+    def __init__(self, tick=0.25, slots=512, on_resolved=None, timer=None):
+        self.tick, self.slots, self.on_resolved, self.timer = tick, slots, on_resolved, timer
+        self.resolved = 0
+        self._tables = {}  # code -> game
+        self._wheel = [[] for _ in range(slots)]  # entries: (tick, code, game, round, deadline)
+        self._cursor = int(time.time() / tick)    # next tick to process
+        self._wake = queue.SimpleQueue()
+        self._rng = random.Random()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="round-scheduler", daemon=True)
+        self._thread.start()
+
+    def __len__(self): return len(self._tables)
+
+    def watch(self, code, game):
+        self._tables[code] = game
+        game.listeners.append(lambda g, cmd: self._wake.put(code))
+        self._wake.put(code)  # recovered tables may already be ready or past their deadline
+
+    def unwatch(self, code):
+        self._tables.pop(code, None)
+
+    def close(self):
+        self._stop.set()
+        self._wake.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                code = self._wake.get(timeout=max(0.0, self._cursor * self.tick - time.time()))
+                if code is not None: self._service(code)
+            except queue.Empty: pass
+            except Exception: log.exception("round scheduler: servicing a table failed")
+            try: self._advance(time.time())
+            except Exception: log.exception("round scheduler: timer wheel pass failed")
+
+    def _service(self, code):
+        game = self._tables.get(code)
+        if game is None: return
+        snap = game.snapshot()
+        if snap.game_over: return
+        if snap.bots and bots.act(game, self._rng): snap = game.snapshot()
+        if snap.auto_resolve and snap.roster.ready().all(): self._resolve(code, game, snap.round)
+        elif snap.round_deadline is not None: self._schedule(code, game, snap.round, snap.round_deadline)
+
+    def _schedule(self, code, game, round_no, deadline):
+        due = max(-int(-deadline // self.tick), self._cursor)  # first tick at or after the deadline
+        bucket = self._wheel[due % self.slots]
+        entry = (due, code, game, round_no, deadline)
+        if entry not in bucket: bucket.append(entry)
+
+    def _advance(self, now):
+        now_tick = int(now / self.tick)
+        if now_tick - self._cursor >= self.slots:  # slept through a whole revolution: sweep every bucket once
+            due = [e for bucket in self._wheel for e in bucket if e[0] <= now_tick]
+            for bucket in self._wheel: bucket[:] = [e for e in bucket if e[0] > now_tick]
+            self._cursor = now_tick + 1
+            for e in due: self._fire(*e[1:])
+            return
+        while self._cursor <= now_tick:
+            bucket = self._wheel[self._cursor % self.slots]
+            due = [e for e in bucket if e[0] <= self._cursor]
+            if due: bucket[:] = [e for e in bucket if e[0] > self._cursor]
+            self._cursor += 1
+            for e in due: self._fire(*e[1:])
+
+    def _fire(self, code, game, round_no, deadline):
+        if self._tables.get(code) is not game: return
+        snap = game.snapshot()
+        if snap.game_over or snap.round != round_no or snap.round_deadline != deadline: return  # resolved or re-timed since
+        self._resolve(code, game, round_no, deadline)
+
+    def _resolve(self, code, game, round_no, deadline=None):
+        """Close one round; ``on_resolved(code, game, round, deadline)`` hears about it (deadline None: everyone was in)."""
+        with self.timer("resolve_round") if self.timer is not None else contextlib.nullcontext():
+            applied = game.submit("resolve_round", expected_round=round_no)
+        if applied:
+            self.resolved += 1
+            if self.on_resolved is not None: self.on_resolved(code, game, round_no, deadline)
@@ -0,0 +1,110 @@
+"""Bot tournaments: thousands of full games between strategy mixes, spread over every core.
+
+    python -m tournament --games 5000 --strategies random cautious mole sleuth
+    python -m tournament --games 2000 --rule fail_bonus=5 --rule sabotage_penalty=20
+
+Each game seats a strategy drawn from ``--strategies`` in every chair, shuffles roles and
+plays every round through ``GameState`` commands, so bots obey exactly the live rules.
+Game ``i`` draws all of its randomness from child ``i`` of one ``SeedSequence``, which
+makes results identical for a given ``--seed`` no matter how many workers split the work.
+Winners follow the leaderboard: richest, fewest sabotages breaking ties, shared on a tie.
+"""
+import argparse
+import dataclasses
+import os
+import random
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import bots
+import engine
+from game import GameState
+
+
+def play_game(seed, pool, n_players, n_vaults, max_rounds, rules):
+    """One full game. Returns [(strategy, role, won)] per seat."""
+    rng = random.Random(seed)
+    game = GameState(n_players=n_players, n_vaults=n_vaults, max_rounds=max_rounds)
+    game.rules = rules
+    seats = {pid: bots.STRATEGIES[rng.choice(pool)]() for pid in game.roster.pids}
+    game.submit("shuffle_roles", seed=rng.getrandbits(63))
+    while not game.game_over:
+        bots.act(game, rng, seats)
+        game.submit("resolve_round", expected_round=game.round, seed=rng.getrandbits(63))
+    r = game.roster
+    top = r.ranking()[0]
+    won = (r.cash == r.cash[top]) & (r.total_sabotages == r.total_sabotages[top])
+    return [(seats[pid].name, r.role_name(pid), bool(won[pid - 1])) for pid in r.pids]
+
+
+def play_chunk(seeds, pool, n_players, n_vaults, max_rounds, rules):
+    """Games for a slice of seeds, folded into Counters of seats and wins keyed by (strategy, role)."""
+    seats, wins = Counter(), Counter()
+    for seed in seeds:
+        for strategy, role, won in play_game(seed, pool, n_players, n_vaults, max_rounds, rules):
+            seats[strategy, role] += 1
+            wins[strategy, role] += won
+    return seats, wins
+
+
+def run(games, pool, n_players=5, n_vaults=3, max_rounds=8, rules=engine.DEFAULT_RULES, seed=0, workers=None, chunk=250):
+    seeds = [int(s.generate_state(1, np.uint64)[0] >> 1) for s in np.random.SeedSequence(seed).spawn(games)]
+    chunks = [seeds[i:i + chunk] for i in range(0, games, chunk)]
+    seats, wins = Counter(), Counter()
+    args = (pool, n_players, n_vaults, max_rounds, rules)
+    if workers == 1:
+        results = [play_chunk(c, *args) for c in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as ex: results = list(ex.map(play_chunk, chunks, *[[a] * len(chunks) for a in args]))
+    for s, w in results:
+        seats.update(s)
+        wins.update(w)
+    return seats, wins
+
+
+def win_rates(seats, wins, key):
+    """Collapse (strategy, role) counts onto ``key``: 0 for strategy, 1 for role, None for both."""
+    pick = (lambda k: k) if key is None else (lambda k: k[key])
+    s, w = Counter(), Counter()
+    for k, n in seats.items():
+        s[pick(k)] += n
+        w[pick(k)] += wins[k]
+    return {k: (w[k] / s[k], s[k]) for k in sorted(s)}
+
+
+def parse_rule(text):
+    name, value = text.split("=", 1)
+    current = getattr(engine.DEFAULT_RULES, name)
+    return name, tuple(float(v) for v in value.split(",")) if isinstance(current, tuple) else type(current)(value)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--games", type=int, default=2000)
+    parser.add_argument("--strategies", nargs="+", default=list(bots.STRATEGIES), choices=list(bots.STRATEGIES))
+    parser.add_argument("--players", type=int, default=5)
+    parser.add_argument("--vaults", type=int, default=3)
+    parser.add_argument("--rounds", type=int, default=8)
+    parser.add_argument("--rule", action="append", default=[], metavar="NAME=VALUE", help="override an engine.Rules field, e.g. fail_bonus=5")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args(argv)
+    rules = dataclasses.replace(engine.DEFAULT_RULES, **dict(parse_rule(r) for r in args.rule))
+
+    t0 = time.perf_counter()
+    seats, wins = run(args.games, args.strategies, args.players, args.vaults, args.rounds, rules, args.seed, args.workers)
+    secs = time.perf_counter() - t0
+    print(f"{args.games:,} games x {args.players} seats in {secs:.1f}s ({args.games / secs:,.0f} games/s, {args.workers} workers)")
+    for title, key in (("role", 1), ("strategy", 0), ("strategy / role", None)):
+        print(f"\nwin rate by {title}")
+        for k, (rate, n) in win_rates(seats, wins, key).items():
+            label = " / ".join(k) if isinstance(k, tuple) else k
+            print(f"  {label:<28} {rate:>6.1%}  ({n:,} seats)")
+    return 0
+
+
+if __name__ == "__main__": sys.exit(main())